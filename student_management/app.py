@@ -1,3 +1,8 @@
+import time
+_STARTED = time.perf_counter()
+
+import os
+import multiprocessing
 import flet as ft
 from database.db_manager import DatabaseManager
 from utils.auth import AuthManager
@@ -5,8 +10,17 @@ from views.login_view import LoginView
 from views.main_view import MainView
 from components.common import CustomAppBar 
 from utils.themes import ThemeManager
+from components.render_scheduler import get_render_scheduler, schedule_update
+from utils.fonts import resolve_fonts
+from utils.startup_profiler import StartupProfiler
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+_IMPORTS_DONE = time.perf_counter()
 
 class StudentManagementApp:
+    # Só a primeira sessão do processo é uma abertura a frio
+    _startup_profiled = False
+
     def __init__(self, page: ft.Page):
         self.page = page
         self.page.title = "Sistema de Controle de Alunos"
@@ -15,33 +29,48 @@ class StudentManagementApp:
         self.page.padding = 0
         # self.page.window_icon = "student_management/assets/icon.png"
         
-        # Fontes
-        self.page.fonts = {
-            "Poppins": "https://fonts.gstatic.com/s/poppins/v20/pxiByp8kv8JHgFVrLGT9Z1xlFQ.woff2",
-            "Poppins-Bold": "https://fonts.gstatic.com/s/poppins/v20/pxiByp8kv8JHgFVrLCz7Z1xlFQ.woff2"
-        }
+        # Medição de abertura (opcional, SM_PROFILE_STARTUP=1)
+        self.profiler = StartupProfiler(
+            started=_STARTED,
+            enabled=False if StudentManagementApp._startup_profiled else None
+        )
+        StudentManagementApp._startup_profiled = True
+        self.profiler.record("imports", _IMPORTS_DONE - _STARTED)
         
-        self.page.theme = ft.Theme(font_family="Poppins")
+        # Fontes locais (assets/fonts), sem depender de rede na primeira tela
+        with self.profiler.stage("fontes"):
+            self.page.fonts = resolve_fonts(ASSETS_DIR)
         
-        # Inicializa o tema padrão (Tech Clean)
-        ThemeManager.apply_theme(self.page, "light")
+        # Inicializa o tema padrão (Tech Clean); apply_theme troca page.theme,
+        # então a fonte é definida depois
+        with self.profiler.stage("tema"):
+            ThemeManager.apply_theme(self.page, "light")
+            self.page.theme.font_family = "Poppins"
         
         # Inicializa banco de dados e autenticação
-        self.db = DatabaseManager()
-        self.auth = AuthManager(self.db)
+        with self.profiler.stage("banco"):
+            self.db = DatabaseManager()
+            self.auth = AuthManager(self.db)
         self.username = ""
         
         # Estado
         self.current_user = None
         self.current_view = None
         
+        # Fecha o pool de conexões quando a sessão/janela for encerrada
+        self.page.on_disconnect = self.shutdown
+        self.page.on_close = self.shutdown
+        
         # Inicia na tela de login
-        self.show_login()
+        with self.profiler.stage("primeira tela"):
+            self.show_login()
+            get_render_scheduler(self.page).update_now()
+        self.profiler.report()
     
     def change_theme_callback(self, theme_name):
         ThemeManager.apply_theme(self.page, theme_name)
         self.page.theme.font_family = "Poppins"
-        self.page.update()
+        schedule_update(self.page)
     
     def show_login(self):
         self.page.controls.clear()
@@ -54,7 +83,7 @@ class StudentManagementApp:
         )
         self.current_view = login_view
         self.page.add(login_view.build())
-        self.page.update()
+        schedule_update(self.page)
     
     def on_login_success(self, username: str):
         self.current_user = username
@@ -62,6 +91,7 @@ class StudentManagementApp:
     
     def show_main(self):
         """Exibe a tela principal"""
+        started = time.perf_counter()
         self.page.controls.clear()
         
     
@@ -82,7 +112,22 @@ class StudentManagementApp:
         
         self.current_view = main_view
         self.page.add(main_view.build())
-        self.page.update()
+        # Envia já (inclusive o que estiver agendado) para a medição incluir a tela pronta
+        get_render_scheduler(self.page).update_now()
+        if StartupProfiler.env_enabled():
+            print(f"Login -> tela principal em {(time.perf_counter() - started) * 1000:.0f} ms "
+                  f"(views criadas: {', '.join(f'{name} {ms:.0f} ms' for name, ms in list(main_view.view_build_times.items()))})")
+    
+    def shutdown(self, e=None):
+        """Encerramento limpo: grava o WAL no arquivo e fecha as conexões"""
+        if StartupProfiler.env_enabled():
+            stats = get_render_scheduler(self.page).stats()
+            print(f"Atualizações de tela: {stats['requests']} pedidas, {stats['flushes']} enviadas "
+                  f"({stats['avoided']} evitadas, {stats['avoided_rate']:.0f}%)")
+        try:
+            self.db.close()
+        except Exception as ex:
+            print(f"Erro ao fechar banco: {ex}")
     
     def on_logout(self, e):
         self.current_user = None
@@ -92,4 +137,6 @@ def main(page: ft.Page):
     app = StudentManagementApp(page)
 
 if __name__ == "__main__":
-    ft.app(target=main, assets_dir="assets")
\ No newline at end of file
+    # Necessário no executável (PyInstaller) para os processos dos relatórios
+    multiprocessing.freeze_support()
+    ft.app(target=main, assets_dir=ASSETS_DIR)
\ No newline at end of file
@@ -1,11 +1,19 @@
 # -*- mode: python ; coding: utf-8 -*-
+import glob
+
+# Ícones e fontes de assets/ (sem fonts/cache nem downloads/, gerados em tempo de execução).
+# Sem os .ttf o app usa as URLs do Google Fonts (utils/fonts.py)
+datas = [('assets/*.png', 'assets')]
+for pattern in ('assets/fonts/*.ttf', 'assets/fonts/OFL.txt'):
+    if glob.glob(pattern):
+        datas.append((pattern, 'assets/fonts'))
 
 
 a = Analysis(
     ['app.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=datas,
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -5,9 +5,12 @@ from .common import (
     ConfirmDialog,
     SnackBarMessage,
     LoadingDialog,
+    SkeletonList,
     StudentCard,
     EventCard
 )
+from .keyed_list import KeyedList
+from .background_loader import BackgroundLoader
 
 __all__ = [
     'CustomAppBar',
@@ -16,6 +19,9 @@ __all__ = [
     'ConfirmDialog',
     'SnackBarMessage',
     'LoadingDialog',
+    'SkeletonList',
     'StudentCard',
-    'EventCard'
+    'EventCard',
+    'KeyedList',
+    'BackgroundLoader'
 ]
\ No newline at end of file
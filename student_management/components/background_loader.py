@@ -0,0 +1,57 @@
+import itertools
+import threading
+
+
+class BackgroundLoader:
+    """
+    Executa buscas de dados fora da thread de eventos do Flet e aplica o
+    resultado na tela quando ficar pronto.
+
+    Cada carga tem uma chave (ex: "summary"). Uma nova carga com a mesma chave
+    torna a anterior obsoleta, e cancel() descarta as pendentes (usado ao trocar
+    de tela). A thread não é interrompida: só o resultado obsoleto é ignorado.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self._lock = threading.Lock()
+        self._counter = itertools.count(1)
+        self._current = {}  # chave -> token da carga mais recente
+
+    def load(self, key, fetch, apply, on_error=None):
+        """
+        Roda fetch() em segundo plano e chama apply(resultado) se a carga ainda
+        for a mais recente da chave. Em caso de erro chama on_error(exceção).
+        Retorna o token da carga.
+        """
+        with self._lock:
+            token = next(self._counter)
+            self._current[key] = token
+
+        def run():
+            try:
+                result = fetch()
+            except Exception as ex:
+                if self.is_current(key, token):
+                    if on_error:
+                        on_error(ex)
+                    else:
+                        print(f"Erro ao carregar '{key}': {ex}")
+                return
+            if self.is_current(key, token):
+                apply(result)
+
+        self.page.run_thread(run)
+        return token
+
+    def is_current(self, key, token) -> bool:
+        with self._lock:
+            return self._current.get(key) == token
+
+    def cancel(self, key=None):
+        """Descarta as cargas pendentes da chave (sem chave: todas)"""
+        with self._lock:
+            if key is None:
+                self._current.clear()
+            else:
+                self._current.pop(key, None)
@@ -1,4 +1,5 @@
 import flet as ft
+from .render_scheduler import schedule_update
 
 class CustomAppBar(ft.AppBar):
     def __init__(self, title: str, username: str = "", on_logout=None):
@@ -115,7 +116,7 @@ class ConfirmDialog(ft.AlertDialog):
     def close(self):
         self.open = False
         if self.page:
-            self.page.update()
+            schedule_update(self.page)
 
 class SnackBarMessage:
     @staticmethod
@@ -130,7 +131,7 @@ class SnackBarMessage:
             dismiss_direction=ft.DismissDirection.HORIZONTAL
         )
         page.snack_bar.open = True
-        page.update()
+        schedule_update(page)
 
 class LoadingDialog(ft.AlertDialog):
     def __init__(self, message: str = "Carregando..."):
@@ -143,6 +144,22 @@ class LoadingDialog(ft.AlertDialog):
             )
         )
 
+class SkeletonList(ft.Column):
+    """Blocos cinza no lugar do conteúdo enquanto os dados carregam em segundo plano"""
+    def __init__(self, rows: int = 4, height: int = 70, width=None):
+        super().__init__(
+            controls=[
+                ft.Container(
+                    height=height,
+                    width=width,
+                    bgcolor=ft.colors.SURFACE_VARIANT,
+                    border_radius=12,
+                    opacity=0.6
+                ) for _ in range(rows)
+            ],
+            spacing=10
+        )
+
 class StudentCard(ft.Card):
     def __init__(self, student: dict, on_edit=None, on_delete=None, on_attendance=None, 
                  show_quick_attendance=False, on_quick_present=None, on_quick_absent=None, 
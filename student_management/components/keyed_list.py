@@ -0,0 +1,78 @@
+import threading
+from .render_scheduler import schedule_update
+
+
+class KeyedList:
+    """
+    Reconcilia os controles de um container (Column/ListView) por chave,
+    em vez de limpar e recriar tudo a cada recarga.
+
+    Cada item é descrito por (chave, assinatura, construtor):
+    - chave: identifica o item entre recargas (ex: id do aluno)
+    - assinatura: qualquer valor comparável; se mudar, o controle é reconstruído
+    - construtor: função sem argumentos que cria o controle (só é chamada quando necessário)
+
+    Controles com mesma chave e assinatura são reaproveitados (mesmo objeto),
+    então o Flet envia ao cliente apenas os itens adicionados, removidos ou alterados.
+    """
+
+    def __init__(self, container):
+        self.container = container
+        # sync() pode ser chamado por cargas em segundo plano e por eventos da tela
+        self._lock = threading.RLock()
+        self._entries = {}  # chave -> (assinatura, controle)
+        self.last_stats = {"added": 0, "updated": 0, "removed": 0, "kept": 0}
+
+    def sync(self, items, empty_control=None, push=True):
+        """
+        Aplica a nova lista de itens. Se estiver vazia, mostra empty_control.
+        push=True agenda o envio só deste container (não da página inteira).
+        Retorna True se algo mudou.
+        """
+        with self._lock:
+            return self._sync(items, empty_control, push)
+
+    def _sync(self, items, empty_control, push):
+        stats = {"added": 0, "updated": 0, "removed": 0, "kept": 0}
+        new_entries = {}
+        new_controls = []
+
+        for key, signature, build in items:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                control = entry[1]
+                stats["kept"] += 1
+            else:
+                control = build()
+                stats["updated" if entry is not None else "added"] += 1
+            new_entries[key] = (signature, control)
+            new_controls.append(control)
+
+        stats["removed"] = len(set(self._entries) - set(new_entries))
+        self._entries = new_entries
+        self.last_stats = stats
+
+        if not new_controls and empty_control is not None:
+            new_controls = [empty_control]
+
+        old_controls = self.container.controls
+        changed = len(old_controls) != len(new_controls) or any(a is not b for a, b in zip(old_controls, new_controls))
+        if changed:
+            self.container.controls = new_controls
+            if push:
+                self.push()
+        return changed
+
+    def push(self):
+        """Agenda o envio do container (ignora se ele ainda não está na página)"""
+        if self.container.page is not None:
+            schedule_update(self.container.page, self.container)
+
+    def get(self, key):
+        """Controle atual da chave (ou None)"""
+        entry = self._entries.get(key)
+        return entry[1] if entry else None
+
+    def clear(self):
+        self._entries = {}
+        self.container.controls = []
@@ -0,0 +1,94 @@
+import threading
+import weakref
+
+
+class RenderScheduler:
+    """
+    Agrupa os pedidos de atualização da tela numa única chamada de update().
+
+    Cada page.update() serializa e envia um diff para o cliente Flet. Em vez de
+    chamar direto, o código pede request() (página inteira) ou request(controle):
+    os pedidos feitos durante a mesma ação (dentro de FLUSH_DELAY segundos) são
+    enviados juntos. Se algum pedido for da página inteira, um page.update() cobre
+    todos; senão só os controles marcados são atualizados.
+    """
+
+    # Janela de agrupamento (~1 quadro): imperceptível para quem usa
+    FLUSH_DELAY = 0.016
+
+    def __init__(self, page):
+        self.page = page
+        self._lock = threading.Lock()
+        self._full = False
+        self._controls = {}  # id(controle) -> controle, em ordem de pedido
+        self._timer = None
+        self.requests = 0
+        self.flushes = 0
+
+    def request(self, *controls):
+        """Marca controles para atualizar (sem argumentos: a página inteira)"""
+        with self._lock:
+            self.requests += 1
+            if controls:
+                for control in controls:
+                    self._controls.setdefault(id(control), control)
+            else:
+                self._full = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.FLUSH_DELAY, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Envia agora o que estiver pendente"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            full, controls = self._full, list(self._controls.values())
+            self._full = False
+            self._controls = {}
+            if not full and not controls:
+                return
+            self.flushes += 1
+
+        if full:
+            self.page.update()
+        else:
+            # Controles removidos da tela antes do envio não têm mais o que atualizar
+            mounted = [c for c in controls if c.page is not None]
+            if mounted:
+                self.page.update(*mounted)
+
+    def update_now(self, *controls):
+        """Pedido + envio imediato (quando o passo seguinte depende da tela já atualizada)"""
+        self.request(*controls)
+        self.flush()
+
+    def stats(self) -> dict:
+        avoided = self.requests - self.flushes
+        return {
+            "requests": self.requests,
+            "flushes": self.flushes,
+            "avoided": avoided,
+            "avoided_rate": (avoided / self.requests * 100) if self.requests > 0 else 0
+        }
+
+
+_schedulers = weakref.WeakKeyDictionary()
+_schedulers_lock = threading.Lock()
+
+
+def get_render_scheduler(page) -> RenderScheduler:
+    """Scheduler da página (um por sessão, criado no primeiro uso)"""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(page)
+        if scheduler is None:
+            scheduler = RenderScheduler(page)
+            _schedulers[page] = scheduler
+        return scheduler
+
+
+def schedule_update(page, *controls):
+    """Atalho para get_render_scheduler(page).request(*controls)"""
+    get_render_scheduler(page).request(*controls)
@@ -1,3 +1,4 @@
 from .db_manager import DatabaseManager
+from .connection_pool import ConnectionPool
 
-__all__ = ['DatabaseManager']
\ No newline at end of file
+__all__ = ['DatabaseManager', 'ConnectionPool']
\ No newline at end of file
@@ -0,0 +1,149 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """
+    Mantém conexões SQLite de longa duração:
+    - Uma conexão de leitura por thread (o Flet roda os handlers em várias threads).
+    - Uma conexão dedicada de escrita, protegida por lock.
+    O modo WAL é ligado uma única vez, na abertura do escritor, para que as
+    leituras não fiquem bloqueadas enquanto uma escrita está em andamento.
+    """
+
+    def __init__(self, db_path: str, timeout: float = 10.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self._after_commit = None  # callbacks da transação aberta (after_commit)
+        self._writer = None
+        self._readers = []
+        self._generation = 0
+
+    def _open(self) -> sqlite3.Connection:
+        # isolation_level=None: sem transações implícitas, controlamos BEGIN/COMMIT no write()
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def _get_writer(self) -> sqlite3.Connection:
+        if self._writer is None:
+            self._writer = self._open()
+            self._writer.execute("PRAGMA journal_mode = WAL")
+        return self._writer
+
+    def get_reader(self) -> sqlite3.Connection:
+        """Retorna a conexão de leitura da thread atual (criada na primeira chamada)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "generation", None) != self._generation:
+            # Garante que o WAL já esteja ativo antes da primeira leitura
+            with self._write_lock:
+                self._get_writer()
+            conn = self._open()
+            with self._lock:
+                self._readers.append(conn)
+            self._local.conn = conn
+            self._local.generation = self._generation
+        return conn
+
+    @contextmanager
+    def write(self):
+        """
+        Abre uma transação na conexão de escrita.
+        Chamadas aninhadas (na mesma thread) participam da transação externa.
+        """
+        with self._write_lock:
+            conn = self._get_writer()
+            if self._write_depth > 0:
+                self._write_depth += 1
+                try:
+                    yield conn
+                finally:
+                    self._write_depth -= 1
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            self._write_depth = 1
+            self._after_commit = []
+            try:
+                yield conn
+                conn.execute("COMMIT")
+                committed = self._after_commit
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                self._write_depth = 0
+                self._after_commit = None
+
+        # Fora do lock: quem vier depois já enxerga o commit
+        for callback in committed:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Erro ao aplicar alteração após commit: {e}")
+
+    def after_commit(self, callback):
+        """
+        Agenda callback() para depois do COMMIT da transação mais externa (dentro
+        de write()). Se ela terminar em ROLLBACK, o callback é descartado.
+        """
+        with self._write_lock:
+            if self._after_commit is None:
+                raise RuntimeError("after_commit() fora de uma transação de escrita")
+            self._after_commit.append(callback)
+
+    def backup_to(self, path):
+        """
+        Cópia consistente do banco para path pela API de backup do SQLite:
+        inclui as páginas que ainda estão no -wal e não depende de checkpoint.
+        """
+        dest = sqlite3.connect(path)
+        try:
+            with self._write_lock:
+                self._get_writer().backup(dest)
+        finally:
+            dest.close()
+
+    def restore_from(self, path):
+        """
+        Substitui o conteúdo do banco pelo do arquivo path pela API de backup,
+        na conexão de escrita: os leitores abertos (outras threads, relatórios)
+        continuam válidos e passam a ver os dados restaurados.
+        """
+        source = sqlite3.connect(path)
+        try:
+            with self._write_lock:
+                source.backup(self._get_writer())
+        finally:
+            source.close()
+
+    def checkpoint(self):
+        """Descarrega o WAL no arquivo principal (usado antes de copiar o banco)"""
+        with self._write_lock:
+            self._get_writer().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close_all(self):
+        """Fecha todas as conexões. O pool pode ser reutilizado depois (reabre sob demanda)."""
+        with self._write_lock:
+            with self._lock:
+                for conn in self._readers:
+                    try:
+                        conn.close()
+                    except sqlite3.Error:
+                        pass
+                self._readers.clear()
+                self._generation += 1
+
+            if self._writer is not None:
+                try:
+                    self._writer.execute("PRAGMA optimize")
+                    self._writer.close()
+                except sqlite3.Error:
+                    pass
+                self._writer = None
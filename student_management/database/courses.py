@@ -0,0 +1,53 @@
+import re
+from .schedule import fold_text
+
+# Catálogo inicial (os valores que ficavam fixos no relatório financeiro)
+DEFAULT_COURSES = [
+    ("Desenvolvimento de jogos 2D", 550.00),
+    ("Unity 3D", 860.00),
+    ("Lógica de programação", 320.00),
+    ("Python para dados", 980.00),
+]
+
+DEFAULT_EXPENSES = [
+    ("Aluguel/Espaco", 800.00),
+    ("Energia e Internet", 250.00),
+    ("Marketing", 150.00),
+    ("Softwares", 100.00),
+]
+
+
+def course_key(name) -> str:
+    """Chave normalizada do curso: minúsculas, sem acentos e espaços simples"""
+    return re.sub(r"\s+", " ", fold_text(name)).strip()
+
+
+def match_course(key, catalog):
+    """
+    Id do curso do catálogo [(id, chave)] para a chave informada: igual, ou o
+    curso de chave mais longa contido nela ('unity 3d avancado' -> 'unity 3d'),
+    a mesma regra da busca antiga por trecho. None se nenhum servir.
+    """
+    best = None
+    for course_id, catalog_key in catalog:
+        if catalog_key == key:
+            return course_id
+        if catalog_key and catalog_key in key and (best is None or len(catalog_key) > len(best[1])):
+            best = (course_id, catalog_key)
+    return best[0] if best else None
+
+
+def resolve_course_id(cursor, name):
+    """
+    Id do curso para o texto livre digitado no cadastro (dentro da transação).
+    Curso desconhecido entra no catálogo com mensalidade 0, para ser precificado depois.
+    """
+    key = course_key(name)
+    if not key:
+        return None
+    cursor.execute("SELECT id, key FROM courses")
+    course_id = match_course(key, cursor.fetchall())
+    if course_id is None:
+        cursor.execute("INSERT INTO courses (name, key, monthly_price) VALUES (?, ?, 0)", (name.strip(), key))
+        course_id = cursor.lastrowid
+    return course_id
@@ -1,5 +1,19 @@
 import sqlite3
 import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from calendar import monthrange
+from .connection_pool import ConnectionPool
+from .migrations import run_migrations, rebuild_attendance_monthly, reset_data_epoch
+from .query_cache import QueryCache
+from .schedule import parse_course_days, ScheduleIndex
+from .courses import course_key, resolve_course_id
+from .search_index import StudentSearchIndex
+from .write_queue import AttendanceWriteQueue
+
+# Tabelas de que a grade (ScheduleIndex) depende
+SCHEDULE_TABLES = ('students', 'student_schedule')
 
 class DatabaseManager:
     def __init__(self):
@@ -7,101 +21,132 @@ class DatabaseManager:
         base_dir = os.path.dirname(os.path.abspath(__file__))
         project_root = os.path.dirname(base_dir)
         self.db_name = os.path.join(project_root, "students.db")
-        
+
         print(f"Banco de Dados carregado em: {self.db_name}")
-        
+
+        # Conexões persistentes (uma por thread para leitura + uma de escrita)
+        self.pool = ConnectionPool(self.db_name)
+
+        # Cache de consultas, invalidado pelas versões das tabelas no banco (table_versions)
+        self._sync_state = threading.local()
+        self.cache = QueryCache(sync=self._sync_versions)
+        # Busca de alunos em memória (construída na primeira busca, depois incremental)
+        self.search_index = StudentSearchIndex()
+        # Grade dia -> horário -> alunos (construída no primeiro uso, depois incremental)
+        self.schedule_index = ScheduleIndex()
+        # Gravações de presença da chamada rápida (em lote, fora da thread da tela)
+        self.attendance_queue = AttendanceWriteQueue(self)
         self.init_database()
 
     def get_connection(self):
-        return sqlite3.connect(self.db_name)
+        """Conexão de leitura da thread atual. Não feche: ela é reaproveitada pelo pool."""
+        return self.pool.get_reader()
 
-    def init_database(self):
+    @contextmanager
+    def transaction(self, *tables):
+        """
+        Context manager de escrita: commit ao sair do bloco, rollback se houver erro.
+        As tabelas informadas têm a versão incrementada pelos triggers de
+        table_versions; sem tabelas o cache é descartado inteiro (use assim para
+        SQL avulso em tabelas sem versão).
+        """
+        with self.pool.write() as conn:
+            yield conn
+        if not tables:
+            self.cache.clear()
+        self._sync_versions(force=True)
+
+    def _sync_versions(self, force=False):
+        """
+        Atualiza as versões do QueryCache a partir de table_versions. PRAGMA
+        data_version (da conexão de leitura da thread) só muda quando outra
+        conexão grava no arquivo, então a tabela só é relida depois de alguma
+        escrita: desta sessão, de outra instância do app ou de um script.
+        """
         conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Tabela de Usuários
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Tabela de Alunos
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS students (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                course TEXT NOT NULL,
-                course_days TEXT NOT NULL,
-                class_time TEXT,
-                active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Tabela de Presença
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS attendance (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id INTEGER,
-                date DATE NOT NULL,
-                present BOOLEAN NOT NULL,
-                note TEXT,
-                FOREIGN KEY (student_id) REFERENCES students (id)
-            )
-        ''')
-        
-        # Tabela de Eventos
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                event_date DATE NOT NULL,
-                event_type TEXT DEFAULT 'aviso'
-            )
-        ''')
-        
-        # Alunos Gratuitos
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS free_students (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                phone TEXT,
-                class_time TEXT,
-                start_lesson TEXT,
-                active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Notas do Professor
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS teacher_notes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                content TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute("SELECT count(*) FROM teacher_notes")
-        if cursor.fetchone()[0] == 0:
-            cursor.execute("INSERT INTO teacher_notes (content) VALUES ('')")
-
-        conn.commit()
-        conn.close()
+        state = self._sync_state
+        try:
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if not force and getattr(state, 'conn', None) is conn and state.data_version == data_version:
+                return
+            versions = dict(conn.execute("SELECT name, version FROM table_versions").fetchall())
+        except sqlite3.OperationalError as e:
+            # Banco fechado ou ainda sem a migração v7: trata como sem cache
+            print(f"Erro ao ler versões das tabelas: {e}")
+            self.cache.clear()
+            return
+        state.conn, state.data_version = conn, data_version
+        self.cache.set_versions(versions)
+
+    @staticmethod
+    def _table_versions(conn, *tables):
+        """
+        Versões das tabelas (mais a época '*') lidas na conexão de escrita, dentro
+        da transação: antes e depois dos comandos dão os carimbos exatos da escrita.
+        """
+        names = tables + (QueryCache.ALL_TABLES,)
+        rows = dict(conn.execute(
+            f"SELECT name, version FROM table_versions WHERE name IN ({','.join('?' * len(names))})", names
+        ).fetchall())
+        return tuple(rows.get(name, 0) for name in names)
+
+    def data_version(self, *tables) -> tuple:
+        """Versão dos dados das tabelas (para caches fora do banco, ex: relatórios)"""
+        return self.cache.version(*tables)
+
+    @staticmethod
+    def data_version_covers(loaded, written) -> bool:
+        """True se a leitura feita na versão loaded já inclui a escrita da versão written"""
+        return QueryCache.covers(loaded, written)
+
+    def cache_stats(self) -> dict:
+        """Acertos/erros do cache de consultas"""
+        return self.cache.stats()
+
+    def checkpoint(self):
+        """Grava o conteúdo do WAL no arquivo .db (necessário antes de copiar o banco)"""
+        self.pool.checkpoint()
+
+    def backup_to(self, path):
+        """Cópia do banco para path (API de backup do SQLite, consistente mesmo com leituras em andamento)"""
+        # Presenças ainda na fila entram na cópia
+        self.attendance_queue.flush()
+        self.pool.backup_to(path)
+
+    def restore_from(self, path):
+        """Substitui os dados pelos do backup em path, sem fechar as conexões abertas"""
+        # Presenças na fila são gravadas antes, para não caírem por cima do backup
+        self.attendance_queue.flush()
+        self.pool.restore_from(path)
+        self.reopen()
+
+    def close(self):
+        """Grava as presenças pendentes e fecha todas as conexões do pool"""
+        self.attendance_queue.stop()
+        self.pool.close_all()
+        self.cache.clear()
+
+    def init_database(self):
+        """Aplica as migrações pendentes (não faz nada se o schema já está na versão atual)"""
+        run_migrations(self.pool)
+
+    def reopen(self):
+        """
+        Depois de substituir o arquivo do banco (restore): aplica as migrações
+        que o backup não tiver e sorteia uma nova época em table_versions, para
+        que nenhum cache (desta ou de outra sessão) confunda as versões do
+        arquivo restaurado com as do anterior.
+        """
+        self.cache.clear()
+        self.init_database()
+        with self.transaction() as conn:
+            reset_data_epoch(conn.cursor())
 
     # --- MÉTODOS DE USUÁRIO (AUTH) ---
     def create_user(self, username, password_hash):
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO users (username, password_hash) VALUES (?, ?)", (username, password_hash))
-            conn.commit()
-            conn.close()
+            with self.transaction('users') as conn:
+                conn.execute("INSERT INTO users (username, password_hash) VALUES (?, ?)", (username, password_hash))
             print(f"Usuário '{username}' criado com sucesso no DB.")
             return True
         except sqlite3.IntegrityError as e:
@@ -109,240 +154,451 @@ class DatabaseManager:
             return False
 
     def get_user(self, username):
-        conn = self.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self.get_connection().cursor()
         cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-        user = cursor.fetchone()
-        conn.close()
-        return user
-    
+        return cursor.fetchone()
+
     def user_exists(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        cursor = self.get_connection().cursor()
         cursor.execute("SELECT COUNT(*) FROM users")
         count = cursor.fetchone()[0]
-        conn.close()
         return count > 0
 
     def update_user_password(self, username, new_password_hash):
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("UPDATE users SET password_hash = ? WHERE username = ?", (new_password_hash, username))
-            if cursor.rowcount == 0:
-                conn.close()
-                return False
-            conn.commit()
-            conn.close()
-            return True
+            with self.transaction('users') as conn:
+                cursor = conn.execute("UPDATE users SET password_hash = ? WHERE username = ?", (new_password_hash, username))
+                return cursor.rowcount > 0
         except Exception as e:
             print(f"Erro DB Update: {e}")
             return False
 
     # --- MÉTODOS DE ALUNOS ---
+    def _save_schedule(self, conn, student_id, days, time):
+        """Regrava a grade semanal do aluno (chamado dentro da transação de escrita)"""
+        conn.execute("DELETE FROM student_schedule WHERE student_id = ?", (student_id,))
+        conn.executemany("INSERT INTO student_schedule (student_id, weekday, class_time) VALUES (?, ?, ?)",
+                         [(student_id, weekday, time) for weekday in parse_course_days(days)])
+
+    def _update_indexes(self, student_id, name, course, days, time, stamps, schedule_stamps):
+        """
+        Agenda a atualização da busca e da grade para depois do commit da
+        transação mais externa (create_student pode estar dentro de
+        promote_free_to_paid): num ROLLBACK os índices não recebem um aluno
+        que nunca foi gravado. name None = aluno removido.
+        """
+        def apply():
+            if name is None:
+                self.search_index.remove(student_id, *stamps)
+                self.schedule_index.remove(student_id, *schedule_stamps)
+            else:
+                self.search_index.update(student_id, name, course, *stamps)
+                self.schedule_index.update(student_id, name, parse_course_days(days), time, *schedule_stamps)
+        self.pool.after_commit(apply)
+
     def create_student(self, name, course, days, time):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO students (name, course, course_days, class_time) VALUES (?, ?, ?, ?)", 
-                      (name, course, days, time))
-        conn.commit()
-        conn.close()
+        with self.transaction('students', 'student_schedule', 'courses') as conn:
+            stamp = self._table_versions(conn, 'students')
+            schedule_stamp = self._table_versions(conn, *SCHEDULE_TABLES)
+            course_id = resolve_course_id(conn.cursor(), course)
+            cursor = conn.execute("INSERT INTO students (name, course, course_days, class_time, course_id) VALUES (?, ?, ?, ?, ?)",
+                          (name, course, days, time, course_id))
+            student_id = cursor.lastrowid
+            self._save_schedule(conn, student_id, days, time)
+            new_stamp = self._table_versions(conn, 'students')
+            new_schedule_stamp = self._table_versions(conn, *SCHEDULE_TABLES)
+            self._update_indexes(student_id, name, course, days, time, (stamp, new_stamp),
+                                 (schedule_stamp, new_schedule_stamp))
+        return student_id
+
+    def get_student(self, student_id):
+        """Um aluno (ativo ou não) pelo id, ou None"""
+        cursor = self.get_connection().cursor()
+        cursor.execute("SELECT * FROM students WHERE id = ?", (student_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
 
     def get_all_students(self):
-        conn = self.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM students WHERE active = 1 ORDER BY name")
-        students = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return students
-    
+        def load():
+            cursor = self.get_connection().cursor()
+            cursor.execute("SELECT * FROM students WHERE active = 1 ORDER BY name, id")
+            return [dict(row) for row in cursor.fetchall()]
+        return self.cache.get_or_load(('all_students',), ('students',), load)
+
+    def get_students_page(self, after_name=None, limit=50, after_id=None):
+        """
+        Página de alunos ativos em ordem de nome (paginação por chave, sem OFFSET).
+        Continua depois de (after_name, after_id); sem after_id pula todos com after_name.
+        Percorre o índice parcial idx_students_active_name, então o custo não cresce
+        com a posição da página. Não usa o cache (cada página seria uma entrada).
+        """
+        cursor = self.get_connection().cursor()
+        if after_name is None:
+            cursor.execute("SELECT * FROM students WHERE active = 1 ORDER BY name, id LIMIT ?", (limit,))
+        elif after_id is None:
+            cursor.execute("SELECT * FROM students WHERE active = 1 AND name > ? ORDER BY name, id LIMIT ?",
+                           (after_name, limit))
+        else:
+            cursor.execute("SELECT * FROM students WHERE active = 1 AND (name, id) > (?, ?) ORDER BY name, id LIMIT ?",
+                           (after_name, after_id, limit))
+        return [dict(row) for row in cursor.fetchall()]
+
     def update_student(self, student_id, name, course, days, time):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE students SET name=?, course=?, course_days=?, class_time=? WHERE id=?", 
-                      (name, course, days, time, student_id))
-        conn.commit()
-        conn.close()
+        with self.transaction('students', 'student_schedule', 'courses') as conn:
+            stamp = self._table_versions(conn, 'students')
+            schedule_stamp = self._table_versions(conn, *SCHEDULE_TABLES)
+            course_id = resolve_course_id(conn.cursor(), course)
+            conn.execute("UPDATE students SET name=?, course=?, course_days=?, class_time=?, course_id=? WHERE id=?",
+                          (name, course, days, time, course_id, student_id))
+            self._save_schedule(conn, student_id, days, time)
+            new_stamp = self._table_versions(conn, 'students')
+            new_schedule_stamp = self._table_versions(conn, *SCHEDULE_TABLES)
+            self._update_indexes(student_id, name, course, days, time, (stamp, new_stamp),
+                                 (schedule_stamp, new_schedule_stamp))
+
+    def search_students(self, query):
+        """
+        Ids dos alunos ativos cujo nome ou curso contém query, ignorando acentos.
+        None quando a busca está vazia (sem filtro).
+        """
+        if not query or not query.strip():
+            return None
+        stamp = self.cache.version('students')
+        if self.search_index.generation != stamp:
+            self.search_index.build(self.get_all_students(), stamp)
+        return self.search_index.search(query)
+
+    def get_students_for_weekday(self, weekday):
+        """Alunos ativos com aula no dia da semana (0 = segunda ... 6 = domingo), por horário"""
+        def load():
+            cursor = self.get_connection().cursor()
+            cursor.execute('''
+                SELECT s.* FROM student_schedule sc
+                JOIN students s ON s.id = sc.student_id
+                WHERE sc.weekday = ? AND s.active = 1
+                ORDER BY sc.class_time, s.name
+            ''', (weekday,))
+            return [dict(row) for row in cursor.fetchall()]
+        return self.cache.get_or_load(('students_for_weekday', weekday), ('students', 'student_schedule'), load)
+
+    def get_student_weekdays(self):
+        """{student_id: [weekdays]} de todos os alunos ativos, numa consulta"""
+        def load():
+            cursor = self.get_connection().cursor()
+            cursor.execute('''
+                SELECT sc.student_id, sc.weekday FROM student_schedule sc
+                JOIN students s ON s.id = sc.student_id
+                WHERE s.active = 1
+                ORDER BY sc.weekday
+            ''')
+            result = {}
+            for student_id, weekday in cursor.fetchall():
+                result.setdefault(student_id, []).append(weekday)
+            return result
+        return self.cache.get_or_load(('student_weekdays',), ('students', 'student_schedule'), load)
+
+    def get_schedule_slots(self):
+        """
+        {weekday: {horário: [ids]}} dos alunos ativos (weekday None = sem dia reconhecido),
+        com os horários e os alunos de cada horário em ordem.
+        """
+        stamp = self.cache.version(*SCHEDULE_TABLES)
+        if self.schedule_index.generation != stamp:
+            cursor = self.get_connection().cursor()
+            cursor.execute('''
+                SELECT s.id, s.name, s.class_time, sc.weekday FROM students s
+                LEFT JOIN student_schedule sc ON sc.student_id = s.id
+                WHERE s.active = 1
+            ''')
+            self.schedule_index.build(cursor.fetchall(), stamp)
+        return self.schedule_index.slots()
 
     def delete_student(self, student_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE students SET active = 0 WHERE id = ?", (student_id,))
-        conn.commit()
-        conn.close()
+        with self.transaction('students') as conn:
+            stamp = self._table_versions(conn, 'students')
+            schedule_stamp = self._table_versions(conn, *SCHEDULE_TABLES)
+            conn.execute("UPDATE students SET active = 0 WHERE id = ?", (student_id,))
+            new_stamp = self._table_versions(conn, 'students')
+            new_schedule_stamp = self._table_versions(conn, *SCHEDULE_TABLES)
+            self._update_indexes(student_id, None, None, None, None, (stamp, new_stamp),
+                                 (schedule_stamp, new_schedule_stamp))
 
     # --- PRESENÇA ---
+    # Depende do índice único attendance(student_id, date) criado na migração v2
+    UPSERT_ATTENDANCE = """
+        INSERT INTO attendance (student_id, date, present, note) VALUES (?, ?, ?, ?)
+        ON CONFLICT(student_id, date) DO UPDATE SET present = excluded.present, note = excluded.note
+    """
+
     def mark_attendance(self, student_id, date, present, note=""):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id FROM attendance WHERE student_id = ? AND date = ?", (student_id, date))
-        existing = cursor.fetchone()
-        
-        if existing:
-            cursor.execute("UPDATE attendance SET present = ?, note = ? WHERE id = ?", (present, note, existing[0]))
-        else:
-            cursor.execute("INSERT INTO attendance (student_id, date, present, note) VALUES (?, ?, ?, ?)", 
-                          (student_id, date, present, note))
-        conn.commit()
-        conn.close()
+        with self.transaction('attendance') as conn:
+            conn.execute(self.UPSERT_ATTENDANCE, (student_id, date, present, note))
         return True
 
+    def mark_attendance_bulk(self, records):
+        """
+        Marca a presença de vários alunos numa única transação.
+        records: lista de (student_id, date, present) ou (student_id, date, present, note).
+        Retorna quantos registros foram gravados.
+        """
+        rows = [(r[0], r[1], r[2], r[3] if len(r) > 3 else "") for r in records]
+        if not rows:
+            return 0
+        with self.transaction('attendance') as conn:
+            conn.executemany(self.UPSERT_ATTENDANCE, rows)
+        return len(rows)
+
+    def queue_attendance(self, student_id, date, present, note="", on_done=None, on_error=None):
+        """
+        Agenda a marcação para a fila de gravação em lote e retorna na hora.
+        on_done() é chamado depois do commit; on_error(exceção) se a gravação falhar.
+        """
+        self.attendance_queue.submit(student_id, date, present, note, on_done=on_done, on_error=on_error)
+
     def get_attendance_by_date(self, student_id, date):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        cursor = self.get_connection().cursor()
         cursor.execute("SELECT present FROM attendance WHERE student_id = ? AND date = ?", (student_id, date))
         result = cursor.fetchone()
-        conn.close()
         return result[0] if result else None
 
-    def get_attendance_summary(self, student_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM attendance WHERE student_id = ? AND present = 1", (student_id,))
-        present = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM attendance WHERE student_id = ? AND present = 0", (student_id,))
-        absent = cursor.fetchone()[0]
-        conn.close()
-        
+    def get_attendance_map(self, date, end_date=None):
+        """
+        Presença de todos os alunos numa única consulta (usa o índice por data).
+        - Só date: {student_id: (present, note)}
+        - date + end_date: {student_id: {data: (present, note)}}
+        """
+        def load():
+            cursor = self.get_connection().cursor()
+            if end_date is None:
+                cursor.execute("SELECT student_id, present, note FROM attendance WHERE date = ?", (date,))
+                return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+            cursor.execute("SELECT student_id, date, present, note FROM attendance WHERE date BETWEEN ? AND ?", (date, end_date))
+            result = {}
+            for row in cursor.fetchall():
+                result.setdefault(row[0], {})[row[1]] = (row[2], row[3])
+            return result
+        return self.cache.get_or_load(('attendance_map', date, end_date), ('attendance',), load)
+
+    @staticmethod
+    def _build_summary(present, absent):
         total = present + absent
         percentage = (present / total * 100) if total > 0 else 0
         return {"present": present, "absent": absent, "total": total, "percentage": percentage}
 
+    def get_attendance_summary(self, student_id):
+        cursor = self.get_connection().cursor()
+        cursor.execute("SELECT COALESCE(SUM(present = 1), 0), COALESCE(SUM(present = 0), 0) FROM attendance WHERE student_id = ?", (student_id,))
+        present, absent = cursor.fetchone()
+        return self._build_summary(present, absent)
+
+    def get_attendance_summaries(self, start_date=None, end_date=None):
+        """
+        Presenças/faltas de todos os alunos num único GROUP BY.
+        Opcionalmente limitado ao período [start_date, end_date].
+        Retorna {student_id: {"present", "absent", "total", "percentage"}}
+        (alunos sem registro no período não aparecem).
+        """
+        query = "SELECT student_id, SUM(present = 1), SUM(present = 0) FROM attendance"
+        params = ()
+        if start_date and end_date:
+            query += " WHERE date BETWEEN ? AND ?"
+            params = (start_date, end_date)
+        query += " GROUP BY student_id"
+
+        def load():
+            cursor = self.get_connection().cursor()
+            cursor.execute(query, params)
+            return {row[0]: self._build_summary(row[1], row[2]) for row in cursor.fetchall()}
+        return self.cache.get_or_load(('attendance_summaries',) + params, ('attendance',), load)
+
     def get_attendance(self, student_id, start_date, end_date):
-        conn = self.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM attendance WHERE student_id = ? AND date BETWEEN ? AND ? ORDER BY date DESC", 
+        cursor = self.get_connection().cursor()
+        cursor.execute("SELECT * FROM attendance WHERE student_id = ? AND date BETWEEN ? AND ? ORDER BY date DESC",
                       (student_id, start_date, end_date))
-        data = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return data
+        return [dict(row) for row in cursor.fetchall()]
+
+    def delete_attendance(self, student_id, date):
+        """Remove a marcação do dia (os triggers ajustam stats e o consolidado mensal)"""
+        with self.transaction('attendance') as conn:
+            cursor = conn.execute("DELETE FROM attendance WHERE student_id = ? AND date = ?", (student_id, date))
+        return cursor.rowcount > 0
 
     def get_attendance_note(self, student_id, date):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        cursor = self.get_connection().cursor()
         cursor.execute("SELECT note FROM attendance WHERE student_id = ? AND date = ?", (student_id, date))
         row = cursor.fetchone()
-        conn.close()
         return row[0] if row else ""
 
     # --- EVENTOS ---
     def create_event(self, title, description, date, event_type):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO events (title, description, event_date, event_type) VALUES (?, ?, ?, ?)", 
-                      (title, description, date, event_type))
-        conn.commit()
-        conn.close()
-    
+        with self.transaction('events') as conn:
+            conn.execute("INSERT INTO events (title, description, event_date, event_type) VALUES (?, ?, ?, ?)",
+                          (title, description, date, event_type))
+
     def get_events(self, from_date=None, to_date=None):
-        conn = self.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        if from_date and to_date:
-            cursor.execute("SELECT * FROM events WHERE event_date BETWEEN ? AND ? ORDER BY event_date", (from_date, to_date))
-        else:
-            cursor.execute("SELECT * FROM events ORDER BY event_date")
-        events = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return events
+        def load():
+            cursor = self.get_connection().cursor()
+            if from_date and to_date:
+                cursor.execute("SELECT * FROM events WHERE event_date BETWEEN ? AND ? ORDER BY event_date", (from_date, to_date))
+            else:
+                cursor.execute("SELECT * FROM events ORDER BY event_date")
+            return [dict(row) for row in cursor.fetchall()]
+        return self.cache.get_or_load(('events', from_date, to_date), ('events',), load)
+
+    def get_events_by_month(self, year, month):
+        """
+        Eventos do mês agrupados por data: {'YYYY-MM-DD': [eventos]}.
+        Uma consulta por intervalo (índice em event_date) e o resultado fica em cache
+        até o próximo create/update/delete de evento. Não altere o dict retornado.
+        """
+        def load():
+            last_day = monthrange(year, month)[1]
+            events = self.get_events(f"{year}-{month:02d}-01", f"{year}-{month:02d}-{last_day:02d}")
+            by_date = {}
+            for event in events:
+                by_date.setdefault(event['event_date'], []).append(event)
+            return by_date
+        return self.cache.get_or_load(('events_by_month', year, month), ('events',), load)
 
     def update_event(self, event_id, title, description, date, event_type):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE events SET title=?, description=?, event_date=?, event_type=? WHERE id=?", 
-                      (title, description, date, event_type, event_id))
-        conn.commit()
-        conn.close()
+        with self.transaction('events') as conn:
+            conn.execute("UPDATE events SET title=?, description=?, event_date=?, event_type=? WHERE id=?",
+                          (title, description, date, event_type, event_id))
 
     def delete_event(self, event_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM events WHERE id=?", (event_id,))
-        conn.commit()
-        conn.close()
+        with self.transaction('events') as conn:
+            conn.execute("DELETE FROM events WHERE id=?", (event_id,))
 
     # --- FREE STUDENTS ---
     def create_free_student(self, name, phone, class_time, start_lesson):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO free_students (name, phone, class_time, start_lesson) VALUES (?, ?, ?, ?)", 
-                      (name, phone, class_time, start_lesson))
-        conn.commit()
-        conn.close()
+        with self.transaction('free_students') as conn:
+            conn.execute("INSERT INTO free_students (name, phone, class_time, start_lesson) VALUES (?, ?, ?, ?)",
+                          (name, phone, class_time, start_lesson))
 
     def get_all_free_students(self):
-        conn = self.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM free_students WHERE active = 1 ORDER BY name")
-        students = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return students
+        def load():
+            cursor = self.get_connection().cursor()
+            cursor.execute("SELECT * FROM free_students WHERE active = 1 ORDER BY name")
+            return [dict(row) for row in cursor.fetchall()]
+        return self.cache.get_or_load(('all_free_students',), ('free_students',), load)
 
     def update_free_student(self, student_id, name, phone, class_time, start_lesson):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE free_students SET name=?, phone=?, class_time=?, start_lesson=? WHERE id=?", 
-                      (name, phone, class_time, start_lesson, student_id))
-        conn.commit()
-        conn.close()
+        with self.transaction('free_students') as conn:
+            conn.execute("UPDATE free_students SET name=?, phone=?, class_time=?, start_lesson=? WHERE id=?",
+                          (name, phone, class_time, start_lesson, student_id))
 
     def delete_free_student(self, student_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE free_students SET active = 0 WHERE id = ?", (student_id,))
-        conn.commit()
-        conn.close()
-        
+        with self.transaction('free_students') as conn:
+            conn.execute("UPDATE free_students SET active = 0 WHERE id = ?", (student_id,))
+
     def promote_free_to_paid(self, free_student_id, course, days):
-        conn = self.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM free_students WHERE id = ?", (free_student_id,))
-        free_s = cursor.fetchone()
-        if free_s:
-            self.create_student(free_s['name'], course, days, free_s['class_time'])
-            self.delete_free_student(free_student_id)
-            conn.close()
-            return True
-        conn.close()
+        # Uma única transação: cria o aluno pago e desativa o gratuito juntos
+        with self.transaction('students', 'student_schedule', 'courses', 'free_students') as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM free_students WHERE id = ?", (free_student_id,))
+            free_s = cursor.fetchone()
+            if free_s:
+                self.create_student(free_s['name'], course, days, free_s['class_time'])
+                self.delete_free_student(free_student_id)
+                return True
         return False
 
+    # --- CURSOS E FINANCEIRO ---
+    def get_courses(self):
+        """Catálogo de cursos com mensalidade e número de alunos ativos"""
+        def load():
+            cursor = self.get_connection().cursor()
+            cursor.execute('''
+                SELECT c.id, c.name, c.key, c.monthly_price, c.active, COUNT(s.id) AS students
+                FROM courses c
+                LEFT JOIN students s ON s.course_id = c.id AND s.active = 1
+                GROUP BY c.id
+                ORDER BY c.name
+            ''')
+            return [dict(row) for row in cursor.fetchall()]
+        return self.cache.get_or_load(('courses',), ('courses', 'students'), load)
+
+    def save_course(self, name, monthly_price):
+        """Cadastra o curso ou atualiza nome/mensalidade do que tem a mesma chave"""
+        key = course_key(name)
+        with self.transaction('courses') as conn:
+            conn.execute('''
+                INSERT INTO courses (name, key, monthly_price) VALUES (?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET name = excluded.name, monthly_price = excluded.monthly_price
+            ''', (name.strip(), key, monthly_price))
+
+    def get_revenue_by_course(self, month=None):
+        """
+        Receita mensal por curso num único JOIN/GROUP BY (alunos ativos x mensalidade).
+        Cursos sem preço (mensalidade 0) ficam de fora, como na regra antiga.
+        Com month ('YYYY-MM') conta só os alunos cadastrados até o fim daquele mês.
+        Não há data de saída nem histórico de preço: alunos já desativados não
+        entram em meses passados e a mensalidade é a atual do catálogo.
+        """
+        month_end = None
+        if month:
+            year, month_num = map(int, month.split('-'))
+            month_end = f"{month}-{monthrange(year, month_num)[1]:02d}"
+
+        def load():
+            cursor = self.get_connection().cursor()
+            cursor.execute('''
+                SELECT c.name, c.monthly_price, COUNT(s.id), COUNT(s.id) * c.monthly_price
+                FROM courses c
+                JOIN students s ON s.course_id = c.id AND s.active = 1
+                    AND (? IS NULL OR date(s.created_at) <= ?)
+                WHERE c.monthly_price > 0
+                GROUP BY c.id
+                ORDER BY c.name
+            ''', (month_end, month_end))
+            return [{"course": row[0], "price": row[1], "students": row[2], "value": row[3]}
+                    for row in cursor.fetchall()]
+        return self.cache.get_or_load(('revenue_by_course', month_end), ('courses', 'students'), load)
+
+    def get_expenses(self, month=None):
+        """Despesas ativas do mês 'YYYY-MM': as fixas (month NULL) mais as só daquele mês"""
+        def load():
+            cursor = self.get_connection().cursor()
+            cursor.execute('''
+                SELECT id, name, amount, month FROM expenses
+                WHERE active = 1 AND (month IS NULL OR month = ?)
+                ORDER BY month IS NOT NULL, id
+            ''', (month,))
+            return [dict(row) for row in cursor.fetchall()]
+        return self.cache.get_or_load(('expenses', month), ('expenses',), load)
+
+    def add_expense(self, name, amount, month=None):
+        """Nova despesa: fixa (sem mês) ou só do mês 'YYYY-MM'"""
+        with self.transaction('expenses') as conn:
+            conn.execute("INSERT INTO expenses (name, amount, month) VALUES (?, ?, ?)", (name, amount, month))
+
+    def delete_expense(self, expense_id):
+        with self.transaction('expenses') as conn:
+            conn.execute("UPDATE expenses SET active = 0 WHERE id = ?", (expense_id,))
+
     # --- TEACHER STATS ---
     def get_teacher_note(self) -> str:
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        cursor = self.get_connection().cursor()
         cursor.execute("SELECT content FROM teacher_notes ORDER BY id DESC LIMIT 1")
         row = cursor.fetchone()
-        conn.close()
         return row[0] if row else ""
 
     def save_teacher_note(self, content: str):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE teacher_notes SET content = ?, updated_at = CURRENT_TIMESTAMP WHERE id = (SELECT id FROM teacher_notes LIMIT 1)", (content,))
-        conn.commit()
-        conn.close()
+        with self.transaction('teacher_notes') as conn:
+            conn.execute("UPDATE teacher_notes SET content = ?, updated_at = CURRENT_TIMESTAMP WHERE id = (SELECT id FROM teacher_notes LIMIT 1)", (content,))
 
     def get_teacher_stats(self) -> dict:
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM students WHERE active = 1")
-        total_students = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM attendance")
-        total_classes_given = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM free_students WHERE active = 1")
-        total_free_active = cursor.fetchone()[0]
-        conn.close()
-        
+        # Contadores mantidos por triggers (migração v4): leitura de uma única linha
+        cursor = self.get_connection().cursor()
+        cursor.execute("SELECT active_students, total_classes, active_free_students FROM stats WHERE id = 1")
+        total_students, total_classes_given, total_free_active = cursor.fetchone()
+
         xp = (total_students * 50) + (total_classes_given * 10) + (total_free_active * 20)
         level = int(xp / 500) + 1
         next_level_xp = 500 - (xp % 500)
         progress = (xp % 500) / 500
-        
+
         return {
             "students": total_students,
             "classes": total_classes_given,
@@ -353,35 +609,40 @@ class DatabaseManager:
         }
 
     # --- METÓDOS DE RELATÓRIO ---
-    def get_daily_report_data(self, date_str, day_name_fragment):
+    def get_daily_report_data(self, date_str, day_name_fragment=None):
         """
         Gera o relatório do dia:
-        1. Pega todos os alunos que tem aula naquele dia da semana (ex: 'seg').
+        1. Pega todos os alunos que tem aula naquele dia da semana (pela grade student_schedule).
         2. Cruza com a tabela de presença para ver quem veio, faltou ou não tem registro.
+        day_name_fragment (ex: 'seg') é opcional; sem ele o dia da semana vem da própria data.
         """
-        conn = self.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        if day_name_fragment:
+            weekdays = parse_course_days(day_name_fragment)
+            weekday = min(weekdays) if weekdays else -1
+        else:
+            weekday = datetime.strptime(date_str, '%Y-%m-%d').weekday()
 
-        # 1. Busca alunos agendados para este dia da semana
-        # O LIKE %fragment% busca 'seg' dentro de 'Seg/Qua', por exemplo.
-        cursor.execute("SELECT id, name, course, class_time FROM students WHERE active=1 AND course_days LIKE ?", (f"%{day_name_fragment}%",))
-        scheduled_students = [dict(row) for row in cursor.fetchall()]
+        cursor = self.get_connection().cursor()
+
+        # Alunos agendados + presença da data numa única consulta
+        cursor.execute('''
+            SELECT s.name, s.course, s.class_time, a.present, a.note
+            FROM student_schedule sc
+            JOIN students s ON s.id = sc.student_id
+            LEFT JOIN attendance a ON a.student_id = s.id AND a.date = ?
+            WHERE sc.weekday = ? AND s.active = 1
+        ''', (date_str, weekday))
 
         report_data = []
         present_count = 0
         absent_count = 0
         pending_count = 0
 
-        for student in scheduled_students:
-            # 2. Busca o registro de presença para a data específica
-            cursor.execute("SELECT present, note FROM attendance WHERE student_id = ? AND date = ?", (student['id'], date_str))
-            record = cursor.fetchone()
-
+        for record in cursor.fetchall():
             status = "Pendente"
             note = ""
 
-            if record:
+            if record['present'] is not None:
                 if record['present']:
                     status = "Presente"
                     present_count += 1
@@ -393,22 +654,20 @@ class DatabaseManager:
                 pending_count += 1
 
             report_data.append({
-                "name": student['name'],
-                "course": student['course'],
-                "time": student['class_time'],
+                "name": record['name'],
+                "course": record['course'],
+                "time": record['class_time'],
                 "status": status,
                 "note": note
             })
 
-        conn.close()
-
         # Ordena por horário
         report_data.sort(key=lambda x: x['time'] or "23:59")
 
         return {
             "date": date_str,
             "summary": {
-                "total": len(scheduled_students),
+                "total": len(report_data),
                 "present": present_count,
                 "absent": absent_count,
                 "pending": pending_count
@@ -418,40 +677,94 @@ class DatabaseManager:
 
     def get_monthly_report_data(self, month, year):
         """Gera estatísticas gerais do mês"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Formato da data no banco é YYYY-MM-DD
-        # Vamos filtrar onde o strftime do mês e ano batem
-        start_date = f"{year}-{month:02d}-01"
-        # Truque simples para fim do mês: pega o primeiro dia do próximo mês e subtrai um dia, 
-        # ou apenas busca pelo prefixo da string 'YYYY-MM'
-        month_prefix = f"{year}-{month:02d}"
-        
-        cursor.execute("SELECT COUNT(*) FROM attendance WHERE date LIKE ? AND present = 1", (f"{month_prefix}%",))
-        total_presents = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM attendance WHERE date LIKE ? AND present = 0", (f"{month_prefix}%",))
-        total_absents = cursor.fetchone()[0]
-        
-        # Busca alunos com mais faltas no mês (Top 5)
+        month_key = f"{year}-{month:02d}"
+        data = self.get_period_report_data(month_key, month_key)
+        data["month"] = f"{month}/{year}"
+        return data
+
+    def get_quarterly_report_data(self, quarter, year):
+        """Estatísticas do trimestre (quarter de 1 a 4)"""
+        first_month = (quarter - 1) * 3 + 1
+        data = self.get_period_report_data(f"{year}-{first_month:02d}", f"{year}-{first_month + 2:02d}")
+        data["month"] = f"{quarter}º tri/{year}"
+        return data
+
+    def get_yearly_report_data(self, year):
+        """Estatísticas do ano inteiro"""
+        data = self.get_period_report_data(f"{year}-01", f"{year}-12")
+        data["month"] = str(year)
+        return data
+
+    def get_period_report_data(self, start_month, end_month):
+        """
+        Totais e Top 5 de faltas entre os meses 'YYYY-MM' informados (inclusive).
+        Lê o consolidado attendance_monthly em vez de varrer a tabela de presença.
+        """
+        cursor = self.get_connection().cursor()
+
         cursor.execute('''
-            SELECT s.name, COUNT(a.id) as faltas
-            FROM attendance a
-            JOIN students s ON a.student_id = s.id
-            WHERE a.date LIKE ? AND a.present = 0
+            SELECT COALESCE(SUM(present), 0), COALESCE(SUM(absent), 0)
+            FROM attendance_monthly WHERE year_month BETWEEN ? AND ?
+        ''', (start_month, end_month))
+        total_presents, total_absents = cursor.fetchone()
+
+        # Busca alunos com mais faltas no período (Top 5)
+        cursor.execute('''
+            SELECT s.name, SUM(m.absent) as faltas
+            FROM attendance_monthly m
+            JOIN students s ON m.student_id = s.id
+            WHERE m.year_month BETWEEN ? AND ?
             GROUP BY s.id
+            HAVING faltas > 0
             ORDER BY faltas DESC
             LIMIT 5
-        ''', (f"{month_prefix}%",))
+        ''', (start_month, end_month))
         top_absents = [{"name": row[0], "count": row[1]} for row in cursor.fetchall()]
 
-        conn.close()
-        
         return {
-            "month": f"{month}/{year}",
+            "month": f"{start_month} a {end_month}",
             "presents": total_presents,
             "absents": total_absents,
             "attendance_rate": (total_presents / (total_presents + total_absents) * 100) if (total_presents + total_absents) > 0 else 0,
             "top_absents": top_absents
-        }
\ No newline at end of file
+        }
+
+    def get_monthly_summaries(self, start_month, end_month):
+        """
+        Como get_attendance_summaries, mas lendo o consolidado mensal:
+        {student_id: {"present", "absent", "total", "percentage"}} entre os meses 'YYYY-MM'.
+        """
+        def load():
+            cursor = self.get_connection().cursor()
+            cursor.execute('''
+                SELECT student_id, SUM(present), SUM(absent) FROM attendance_monthly
+                WHERE year_month BETWEEN ? AND ?
+                GROUP BY student_id
+            ''', (start_month, end_month))
+            return {row[0]: self._build_summary(row[1], row[2]) for row in cursor.fetchall()}
+        return self.cache.get_or_load(('monthly_summaries', start_month, end_month), ('attendance',), load)
+
+    def get_monthly_breakdown(self, start_month, end_month):
+        """
+        Presenças/faltas de cada aluno mês a mês entre os meses 'YYYY-MM':
+        {student_id: [{"month", "present", "absent", "total", "percentage"}]} em ordem de mês.
+        """
+        def load():
+            cursor = self.get_connection().cursor()
+            cursor.execute('''
+                SELECT student_id, year_month, present, absent FROM attendance_monthly
+                WHERE year_month BETWEEN ? AND ?
+                ORDER BY student_id, year_month
+            ''', (start_month, end_month))
+            breakdown = {}
+            for student_id, year_month, present, absent in cursor.fetchall():
+                month = self._build_summary(present, absent)
+                month["month"] = year_month
+                breakdown.setdefault(student_id, []).append(month)
+            return breakdown
+        return self.cache.get_or_load(('monthly_breakdown', start_month, end_month), ('attendance',), load)
+
+    def rebuild_attendance_monthly(self):
+        """Recalcula o consolidado mensal do zero (para bancos antigos ou após restaurar backup)"""
+        with self.transaction('attendance') as conn:
+            rebuild_attendance_monthly(conn.cursor())
@@ -0,0 +1,36 @@
+"""
+Comandos de manutenção do banco.
+
+Uso (dentro de student_management/):
+    python -m database.maintenance rebuild-monthly
+"""
+import sys
+from .db_manager import DatabaseManager
+
+
+def rebuild_monthly(db: DatabaseManager):
+    db.rebuild_attendance_monthly()
+    print("Consolidado mensal (attendance_monthly) recalculado.")
+
+
+COMMANDS = {
+    "rebuild-monthly": rebuild_monthly,
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print(f"Uso: python -m database.maintenance [{' | '.join(COMMANDS)}]")
+        return 1
+
+    db = DatabaseManager()
+    try:
+        COMMANDS[argv[0]](db)
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,355 @@
+"""
+Migrações versionadas do banco.
+
+A versão do schema fica gravada em PRAGMA user_version. Na abertura, só as
+migrações com número maior que a versão atual são aplicadas, todas dentro de
+uma única transação. Se o banco já está na última versão, nada é executado.
+
+Para alterar o schema: crie uma nova função e adicione no fim de MIGRATIONS.
+Nunca edite uma migração que já foi publicada.
+"""
+from .schedule import parse_course_days
+from .courses import DEFAULT_COURSES, DEFAULT_EXPENSES, course_key, resolve_course_id
+
+
+def _columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def _create_base_schema(cursor):
+    """v1: tabelas base + colunas que antes eram adicionadas pelo fix_db.py / migrate_free_students.py"""
+    # Tabela de Usuários
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Tabela de Alunos
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS students (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            course TEXT NOT NULL,
+            course_days TEXT NOT NULL,
+            class_time TEXT,
+            active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Tabela de Presença
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS attendance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER,
+            date DATE NOT NULL,
+            present BOOLEAN NOT NULL,
+            note TEXT,
+            FOREIGN KEY (student_id) REFERENCES students (id)
+        )
+    ''')
+
+    # Tabela de Eventos
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            event_date DATE NOT NULL,
+            event_type TEXT DEFAULT 'aviso'
+        )
+    ''')
+
+    # Alunos Gratuitos
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS free_students (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            phone TEXT,
+            class_time TEXT,
+            start_lesson TEXT,
+            active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Notas do Professor
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS teacher_notes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Bancos antigos (antes do horário de aula e da aula inicial dos gratuitos)
+    if "class_time" not in _columns(cursor, "students"):
+        cursor.execute("ALTER TABLE students ADD COLUMN class_time TEXT DEFAULT ''")
+
+    free_columns = _columns(cursor, "free_students")
+    if "class_time" not in free_columns:
+        cursor.execute("ALTER TABLE free_students ADD COLUMN class_time TEXT DEFAULT ''")
+    if "start_lesson" not in free_columns:
+        cursor.execute("ALTER TABLE free_students ADD COLUMN start_lesson TEXT")
+
+    cursor.execute("SELECT count(*) FROM teacher_notes")
+    if cursor.fetchone()[0] == 0:
+        cursor.execute("INSERT INTO teacher_notes (content) VALUES ('')")
+
+
+def _add_query_indexes(cursor):
+    """v2: índices para as consultas mais frequentes (presença do dia, calendário e lista de alunos)"""
+    # Remove registros duplicados de presença (fica o mais recente) antes do índice único
+    cursor.execute('''
+        DELETE FROM attendance
+        WHERE id NOT IN (SELECT MAX(id) FROM attendance GROUP BY student_id, date)
+    ''')
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_student_date ON attendance (student_id, date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_date_present ON attendance (date, present)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_date ON events (event_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_active_name ON students (name) WHERE active = 1")
+
+
+def _create_student_schedule(cursor):
+    """v3: grade semanal normalizada (student_schedule) gerada a partir do texto de course_days"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS student_schedule (
+            student_id INTEGER NOT NULL,
+            weekday INTEGER NOT NULL,
+            class_time TEXT,
+            PRIMARY KEY (student_id, weekday),
+            FOREIGN KEY (student_id) REFERENCES students (id)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_schedule_weekday_time ON student_schedule (weekday, class_time)")
+
+    cursor.execute("SELECT id, course_days, class_time FROM students")
+    rows = [
+        (student_id, weekday, class_time)
+        for student_id, course_days, class_time in cursor.fetchall()
+        for weekday in parse_course_days(course_days)
+    ]
+    cursor.executemany("INSERT OR REPLACE INTO student_schedule (student_id, weekday, class_time) VALUES (?, ?, ?)", rows)
+
+
+def _create_stats_counters(cursor):
+    """v4: tabela stats (linha única) mantida por triggers em students, attendance e free_students"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            active_students INTEGER NOT NULL DEFAULT 0,
+            total_classes INTEGER NOT NULL DEFAULT 0,
+            active_free_students INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        INSERT OR REPLACE INTO stats (id, active_students, total_classes, active_free_students) VALUES (
+            1,
+            (SELECT COUNT(*) FROM students WHERE active = 1),
+            (SELECT COUNT(*) FROM attendance),
+            (SELECT COUNT(*) FROM free_students WHERE active = 1)
+        )
+    ''')
+
+    # Alunos e gratuitos: conta só os ativos (o delete normal é soft delete, active = 0)
+    for table, column in (("students", "active_students"), ("free_students", "active_free_students")):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_insert AFTER INSERT ON {table}
+            BEGIN
+                UPDATE stats SET {column} = {column} + (CASE WHEN NEW.active = 1 THEN 1 ELSE 0 END) WHERE id = 1;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_update AFTER UPDATE OF active ON {table}
+            BEGIN
+                UPDATE stats SET {column} = {column}
+                    + (CASE WHEN NEW.active = 1 THEN 1 ELSE 0 END)
+                    - (CASE WHEN OLD.active = 1 THEN 1 ELSE 0 END)
+                WHERE id = 1;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_delete AFTER DELETE ON {table}
+            BEGIN
+                UPDATE stats SET {column} = {column} - (CASE WHEN OLD.active = 1 THEN 1 ELSE 0 END) WHERE id = 1;
+            END
+        ''')
+
+    # Aulas: cada registro de presença conta uma (o UPSERT que só atualiza não altera o total)
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_stats_insert AFTER INSERT ON attendance
+        BEGIN
+            UPDATE stats SET total_classes = total_classes + 1 WHERE id = 1;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_stats_delete AFTER DELETE ON attendance
+        BEGIN
+            UPDATE stats SET total_classes = total_classes - 1 WHERE id = 1;
+        END
+    ''')
+
+
+def rebuild_attendance_monthly(cursor):
+    """Recalcula toda a tabela attendance_monthly a partir de attendance"""
+    cursor.execute("DELETE FROM attendance_monthly")
+    cursor.execute('''
+        INSERT INTO attendance_monthly (student_id, year_month, present, absent)
+        SELECT student_id, substr(date, 1, 7), SUM(present = 1), SUM(present = 0)
+        FROM attendance
+        GROUP BY student_id, substr(date, 1, 7)
+    ''')
+
+
+def _create_attendance_monthly(cursor):
+    """v5: consolidado mensal de presença (attendance_monthly) mantido por triggers"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS attendance_monthly (
+            student_id INTEGER NOT NULL,
+            year_month TEXT NOT NULL,
+            present INTEGER NOT NULL DEFAULT 0,
+            absent INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (student_id, year_month)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_monthly_month ON attendance_monthly (year_month)")
+
+    # Trechos reaproveitados pelos triggers: soma (NEW) e subtrai (OLD) um registro do mês
+    add_new = '''
+        INSERT INTO attendance_monthly (student_id, year_month, present, absent)
+        VALUES (NEW.student_id, substr(NEW.date, 1, 7),
+                CASE WHEN NEW.present = 1 THEN 1 ELSE 0 END,
+                CASE WHEN NEW.present = 0 THEN 1 ELSE 0 END)
+        ON CONFLICT (student_id, year_month) DO UPDATE SET
+            present = attendance_monthly.present + excluded.present,
+            absent = attendance_monthly.absent + excluded.absent;
+    '''
+    remove_old = '''
+        UPDATE attendance_monthly SET
+            present = present - (CASE WHEN OLD.present = 1 THEN 1 ELSE 0 END),
+            absent = absent - (CASE WHEN OLD.present = 0 THEN 1 ELSE 0 END)
+        WHERE student_id = OLD.student_id AND year_month = substr(OLD.date, 1, 7);
+    '''
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_attendance_monthly_insert AFTER INSERT ON attendance BEGIN {add_new} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_attendance_monthly_update AFTER UPDATE OF student_id, date, present ON attendance BEGIN {remove_old} {add_new} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_attendance_monthly_delete AFTER DELETE ON attendance BEGIN {remove_old} END")
+
+    rebuild_attendance_monthly(cursor)
+
+
+def _create_course_catalog(cursor):
+    """v6: catálogo de cursos com mensalidade (courses), despesas (expenses) e alunos ligados por course_id"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS courses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            key TEXT UNIQUE NOT NULL,
+            monthly_price REAL NOT NULL DEFAULT 0,
+            active BOOLEAN DEFAULT 1
+        )
+    ''')
+    # month NULL = despesa fixa (todo mês); 'YYYY-MM' = só naquele mês
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS expenses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            amount REAL NOT NULL,
+            month TEXT,
+            active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_expenses_month ON expenses (month)")
+
+    cursor.executemany("INSERT OR IGNORE INTO courses (name, key, monthly_price) VALUES (?, ?, ?)",
+                       [(name, course_key(name), price) for name, price in DEFAULT_COURSES])
+    cursor.execute("SELECT count(*) FROM expenses")
+    if cursor.fetchone()[0] == 0:
+        cursor.executemany("INSERT INTO expenses (name, amount) VALUES (?, ?)", DEFAULT_EXPENSES)
+
+    if "course_id" not in _columns(cursor, "students"):
+        cursor.execute("ALTER TABLE students ADD COLUMN course_id INTEGER REFERENCES courses (id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_course ON students (course_id) WHERE active = 1")
+
+    # Liga cada texto livre de curso já cadastrado a um curso do catálogo
+    cursor.execute("SELECT DISTINCT course FROM students WHERE course_id IS NULL")
+    for (course,) in cursor.fetchall():
+        course_id = resolve_course_id(cursor, course or "")
+        if course_id is not None:
+            cursor.execute("UPDATE students SET course_id = ? WHERE course = ? AND course_id IS NULL", (course_id, course))
+
+
+# Tabelas com contador de versão (table_versions), lidas pelo cache de consultas
+VERSIONED_TABLES = (
+    "users", "students", "student_schedule", "attendance", "events",
+    "free_students", "teacher_notes", "courses", "expenses",
+)
+
+
+def reset_data_epoch(cursor):
+    """Sorteia uma nova época: versões guardadas antes (ex: antes de restaurar um backup) não batem mais"""
+    cursor.execute("INSERT OR REPLACE INTO table_versions (name, version) VALUES ('*', abs(random()))")
+
+
+def _create_table_versions(cursor):
+    """v7: versão de cada tabela no próprio banco (table_versions), incrementada por triggers a cada escrita"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    cursor.executemany("INSERT OR IGNORE INTO table_versions (name, version) VALUES (?, 0)",
+                       [(table,) for table in VERSIONED_TABLES])
+    reset_data_epoch(cursor)
+
+    # Qualquer conexão (outra sessão, report_cli.py, fake_data.py) passa pelos triggers
+    for table in VERSIONED_TABLES:
+        bump = f"UPDATE table_versions SET version = version + 1 WHERE name = '{table}';"
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()} "
+                           f"AFTER {event} ON {table} BEGIN {bump} END")
+
+
+# Ordem importa: a posição na lista (começando em 1) é o número da versão
+MIGRATIONS = [
+    _create_base_schema,
+    _add_query_indexes,
+    _create_student_schedule,
+    _create_stats_counters,
+    _create_attendance_monthly,
+    _create_course_catalog,
+    _create_table_versions,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(pool) -> int:
+    """
+    Aplica as migrações pendentes numa única transação.
+    Retorna a versão final do schema.
+    """
+    if get_schema_version(pool.get_reader()) >= SCHEMA_VERSION:
+        return SCHEMA_VERSION
+
+    with pool.write() as conn:
+        # Relê dentro da transação (outro processo pode ter migrado antes)
+        current = get_schema_version(conn)
+        cursor = conn.cursor()
+        for version in range(current + 1, SCHEMA_VERSION + 1):
+            migration = MIGRATIONS[version - 1]
+            print(f"Aplicando migração v{version}: {migration.__doc__.split(':', 1)[-1].strip()}")
+            migration(cursor)
+            # PRAGMA não aceita parâmetros; version é sempre um int vindo do range
+            cursor.execute(f"PRAGMA user_version = {version}")
+    return get_schema_version(pool.get_reader())
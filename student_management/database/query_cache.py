@@ -0,0 +1,107 @@
+import threading
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    Cache de leitura com invalidação por tabela.
+
+    A versão de cada tabela vem do próprio banco (table_versions, incrementada
+    por triggers), então escritas de qualquer conexão contam: outra sessão, o
+    report_cli.py ou o fake_data.py. Antes de cada leitura a função sync
+    (DatabaseManager._sync_versions) atualiza as versões conhecidas. Um
+    resultado guardado registra as versões das tabelas de que depende e só é
+    reaproveitado enquanto nenhuma delas mudar.
+    Chaves por data, mês ou período se acumulam durante a sessão: ao passar de
+    MAX_ENTRIES, as menos usadas recentemente saem primeiro (evictions).
+    Os valores retornados são compartilhados: quem chama não deve modificá-los.
+    """
+
+    MAX_ENTRIES = 512
+
+    # Época do banco (sorteada de novo ao restaurar backup): entra em todo carimbo
+    ALL_TABLES = "*"
+
+    def __init__(self, sync=None, max_entries=None):
+        self._sync = sync
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self._lock = threading.Lock()
+        self._generations = {}
+        self._entries = OrderedDict()  # chave -> (carimbo, valor), da menos para a mais usada
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _stamp(self, tables):
+        return tuple(self._generations.get(table, 0) for table in tuple(tables) + (self.ALL_TABLES,))
+
+    def get_or_load(self, key, tables, loader):
+        """Retorna o valor em cache para key ou executa loader() e guarda o resultado"""
+        if self._sync:
+            self._sync()
+        with self._lock:
+            # A versão é lida ANTES de carregar: se houver escrita durante o loader,
+            # o resultado fica com carimbo antigo e é descartado na próxima leitura
+            stamp = self._stamp(tables)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = loader()
+        with self._lock:
+            self._entries[key] = (stamp, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def set_versions(self, versions: dict):
+        """
+        Versões lidas de table_versions ({tabela: versão}). As versões só crescem:
+        uma thread com leitura mais antiga não volta o carimbo para trás. Época
+        diferente (banco restaurado) substitui tudo.
+        """
+        with self._lock:
+            if versions.get(self.ALL_TABLES) != self._generations.get(self.ALL_TABLES):
+                self._generations = dict(versions)
+                return
+            for table, version in versions.items():
+                if version > self._generations.get(table, 0):
+                    self._generations[table] = version
+
+    def clear(self):
+        """Descarta tudo (SQL em tabelas sem versão, banco fechado ou substituído)"""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+    def version(self, *tables) -> tuple:
+        """Carimbo das tabelas (mais a época do banco): muda se alguma delas mudar"""
+        if self._sync:
+            self._sync()
+        with self._lock:
+            return self._stamp(tables)
+
+    @classmethod
+    def covers(cls, loaded, written) -> bool:
+        """
+        True se uma leitura feita no carimbo loaded já enxerga a escrita cujo
+        carimbo (lido depois do commit) é written: mesma época e nenhuma tabela atrás.
+        """
+        if not loaded or not written or len(loaded) != len(written) or loaded[-1] != written[-1]:
+            return False
+        return all(a >= b for a, b in zip(loaded[:-1], written[:-1]))
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / total * 100) if total > 0 else 0
+        }
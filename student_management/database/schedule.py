@@ -0,0 +1,114 @@
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+# Dias da semana no padrão do Python (datetime.weekday(): 0 = segunda ... 6 = domingo)
+WEEKDAY_PREFIXES = {
+    'seg': 0, 'ter': 1, 'qua': 2, 'qui': 3, 'sex': 4, 'sab': 5, 'dom': 6
+}
+
+WEEKDAY_NAMES = {
+    0: 'Segunda-feira', 1: 'Terça-feira', 2: 'Quarta-feira', 3: 'Quinta-feira',
+    4: 'Sexta-feira', 5: 'Sábado', 6: 'Domingo'
+}
+
+
+def fold_text(text) -> str:
+    """Minúsculas e sem acentos ('Sáb' -> 'sab', 'Terça' -> 'terca')"""
+    if not text:
+        return ""
+    text = str(text).lower()
+    if text.isascii():
+        return text
+    normalized = unicodedata.normalize('NFKD', text)
+    return "".join(c for c in normalized if not unicodedata.combining(c))
+
+
+def parse_course_days(course_days) -> set:
+    """
+    Converte o texto livre de dias ('Seg/Qua', 'Terça e Quinta', 'Sábado')
+    no conjunto de weekdays (0-6). Texto sem nenhum dia reconhecido retorna vazio.
+    """
+    text = fold_text(course_days)
+    return {day for prefix, day in WEEKDAY_PREFIXES.items() if prefix in text}
+
+
+class ScheduleIndex:
+    """
+    Grade em memória: weekday -> horário -> ids dos alunos ativos (em ordem de nome).
+
+    Construída uma vez a partir de students + student_schedule e depois mantida
+    aluno a aluno pelas escritas do DatabaseManager. Como o StudentSearchIndex,
+    guarda o carimbo de versão das tabelas com que está sincronizada; se o
+    carimbo não bater, o DatabaseManager a reconstrói.
+    Alunos sem dia reconhecido ficam no weekday None.
+    """
+
+    NO_TIME = 'Sem horário'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots = {}     # weekday -> {horário: [(nome, id)] ordenada}
+        self._students = {}  # id -> (weekdays, horário, nome), para remover
+        self.generation = None
+
+    def _add(self, student_id, name, weekdays, class_time):
+        class_time = class_time or self.NO_TIME
+        weekdays = sorted(weekdays) or [None]
+        for weekday in weekdays:
+            insort(self._slots.setdefault(weekday, {}).setdefault(class_time, []), (name, student_id))
+        self._students[student_id] = (weekdays, class_time, name)
+
+    def _remove(self, student_id):
+        entry = self._students.pop(student_id, None)
+        if entry is None:
+            return
+        weekdays, class_time, name = entry
+        for weekday in weekdays:
+            times = self._slots.get(weekday, {})
+            slot = times.get(class_time, [])
+            i = bisect_left(slot, (name, student_id))
+            if i < len(slot) and slot[i] == (name, student_id):
+                del slot[i]
+            if not slot:
+                times.pop(class_time, None)
+            if not times:
+                self._slots.pop(weekday, None)
+
+    def build(self, rows, generation):
+        """rows: (id, nome, horário, weekday ou None), uma linha por dia do aluno"""
+        students = {}
+        for student_id, name, class_time, weekday in rows:
+            entry = students.setdefault(student_id, (name, class_time, set()))
+            if weekday is not None:
+                entry[2].add(weekday)
+        with self._lock:
+            self._slots = {}
+            self._students = {}
+            for student_id, (name, class_time, weekdays) in students.items():
+                self._add(student_id, name, weekdays, class_time)
+            self.generation = generation
+
+    def update(self, student_id, name, weekdays, class_time, expected, generation):
+        """Regrava um aluno; expected é o carimbo antes da escrita (senão fica para reconstruir)"""
+        with self._lock:
+            if self.generation != expected:
+                return
+            self._remove(student_id)
+            self._add(student_id, name, weekdays, class_time)
+            self.generation = generation
+
+    def remove(self, student_id, expected, generation):
+        with self._lock:
+            if self.generation != expected:
+                return
+            self._remove(student_id)
+            self.generation = generation
+
+    def slots(self) -> dict:
+        """Cópia {weekday: {horário: [ids]}} com os horários em ordem"""
+        with self._lock:
+            return {
+                weekday: {time: [student_id for _, student_id in slot] for time, slot in sorted(times.items())}
+                for weekday, times in self._slots.items()
+            }
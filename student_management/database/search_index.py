@@ -0,0 +1,106 @@
+import threading
+from .schedule import fold_text
+
+
+class StudentSearchIndex:
+    """
+    Índice de busca em memória dos alunos ativos (nome e curso).
+
+    O texto é normalizado com fold_text (minúsculas, sem acentos) e cada trecho
+    de NGRAM caracteres aponta para os ids que o contêm. Buscas a partir de NGRAM
+    caracteres cruzam os trigramas e confirmam no texto normalizado; buscas mais
+    curtas (1-2 letras) percorrem os textos já normalizados.
+
+    O índice guarda a versão da tabela students (table_versions) com que está
+    sincronizado: as escritas do DatabaseManager o atualizam aluno a aluno e,
+    se a versão não bater (escrita de outra conexão, SQL avulso, restore), ele
+    é reconstruído.
+    """
+
+    NGRAM = 3
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._texts = {}  # id -> texto normalizado
+        self._grams = {}  # trecho -> {ids}
+        self.generation = None
+
+    @staticmethod
+    def _normalize(name, course):
+        return f"{fold_text(name)}\n{fold_text(course)}"
+
+    def _grams_of(self, text):
+        size = self.NGRAM
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    def _add(self, student_id, name, course):
+        text = self._normalize(name, course)
+        self._texts[student_id] = text
+        for gram in self._grams_of(text):
+            self._grams.setdefault(gram, set()).add(student_id)
+
+    def _remove(self, student_id):
+        text = self._texts.pop(student_id, None)
+        if text is None:
+            return
+        for gram in self._grams_of(text):
+            ids = self._grams.get(gram)
+            if ids is not None:
+                ids.discard(student_id)
+                if not ids:
+                    del self._grams[gram]
+
+    def build(self, students, generation):
+        """Reconstrói o índice inteiro a partir da lista de alunos ativos"""
+        with self._lock:
+            self._texts = {}
+            self._grams = {}
+            for student in students:
+                self._add(student['id'], student['name'], student['course'])
+            self.generation = generation
+
+    def update(self, student_id, name, course, expected, generation):
+        """
+        Reindexa um aluno. expected é a geração de students antes da escrita:
+        se o índice não estava nela, fica desatualizado e será reconstruído.
+        """
+        with self._lock:
+            if self.generation != expected:
+                return
+            self._remove(student_id)
+            self._add(student_id, name, course)
+            self.generation = generation
+
+    def remove(self, student_id, expected, generation):
+        """Tira um aluno do índice (mesma regra de geração de update)"""
+        with self._lock:
+            if self.generation != expected:
+                return
+            self._remove(student_id)
+            self.generation = generation
+
+    def search(self, query):
+        """
+        Ids cujo nome ou curso contém query (sem diferenciar maiúsculas/acentos).
+        Retorna None para busca vazia (sem filtro).
+        """
+        term = fold_text(query).strip()
+        if not term:
+            return None
+
+        with self._lock:
+            if len(term) < self.NGRAM:
+                return {sid for sid, text in self._texts.items() if term in text}
+
+            postings = []
+            for i in range(len(term) - self.NGRAM + 1):
+                ids = self._grams.get(term[i:i + self.NGRAM])
+                if not ids:
+                    return set()
+                postings.append(ids)
+            postings.sort(key=len)
+            candidates = postings[0].intersection(*postings[1:])
+            return {sid for sid in candidates if term in self._texts[sid]}
+
+    def __len__(self):
+        return len(self._texts)
@@ -0,0 +1,105 @@
+import queue
+import threading
+import time
+
+
+class AttendanceWriteQueue:
+    """
+    Fila de gravação de presença em segundo plano (write-behind).
+
+    A tela marca o aluno na hora e coloca a gravação aqui. Uma thread junta os
+    pedidos que chegarem em até FLUSH_DELAY segundos (no máximo BATCH_SIZE) e
+    grava tudo numa única transação com mark_attendance_bulk. Depois do commit
+    chama on_done de cada pedido; se a transação falhar, chama on_error(exceção)
+    de cada um, para a tela desfazer a marcação.
+    """
+
+    BATCH_SIZE = 25
+    FLUSH_DELAY = 0.3
+
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.written = 0
+        self.failed = 0
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="attendance-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, student_id, date, present, note="", on_done=None, on_error=None):
+        """Agenda a gravação de uma presença (retorna na hora)"""
+        self._ensure_worker()
+        self._queue.put(((student_id, date, present, note), on_done, on_error))
+
+    def _collect_batch(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.FLUSH_DELAY
+        while len(batch) < self.BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Pedido de parada: grava o que já juntou e repassa o sinal
+                self._queue.task_done()
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                self._queue.task_done()
+                return
+
+            batch = self._collect_batch(first)
+            try:
+                self.db.mark_attendance_bulk([record for record, _, _ in batch])
+            except Exception as ex:
+                print(f"Erro ao gravar presenças ({len(batch)}): {ex}")
+                self.failed += len(batch)
+                callbacks = [(on_error, (ex,)) for _, _, on_error in batch]
+            else:
+                self.batches += 1
+                self.written += len(batch)
+                callbacks = [(on_done, ()) for _, on_done, _ in batch]
+
+            for callback, args in callbacks:
+                if callback:
+                    try:
+                        callback(*args)
+                    except Exception as ex:
+                        print(f"Erro no retorno da gravação de presença: {ex}")
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self):
+        """Espera todos os pedidos já enfileirados serem gravados"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def stop(self):
+        """Grava o que estiver pendente e encerra a thread"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._queue.qsize(),
+            "batches": self.batches,
+            "written": self.written,
+            "failed": self.failed
+        }
@@ -22,15 +22,13 @@ def seed_database():
     db = DatabaseManager()
     
     # 1. Limpar dados antigos (Mantendo Usuários)
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM students")
-    cursor.execute("DELETE FROM attendance")
-    cursor.execute("DELETE FROM events")
-    cursor.execute("DELETE FROM free_students")
-    cursor.execute("UPDATE sqlite_sequence SET seq=0 WHERE name='students'") # Resetar IDs
-    conn.commit()
-    conn.close()
+    with db.transaction() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM students")
+        cursor.execute("DELETE FROM attendance")
+        cursor.execute("DELETE FROM events")
+        cursor.execute("DELETE FROM free_students")
+        cursor.execute("UPDATE sqlite_sequence SET seq=0 WHERE name='students'") # Resetar IDs
     print("Dados antigos limpos (Usuários mantidos).")
 
     # 2. Criar Alunos
@@ -92,6 +90,7 @@ def seed_database():
 - Falar com a Ana sobre a reposição de aula."""
     db.save_teacher_note(note_content)
     
+    db.close()
     print("\nBANCO DE DADOS POPULADO COM SUCESSO!")
     print("Agora abra o app e tire seus prints!")
 
@@ -0,0 +1,226 @@
+"""
+Geração de relatórios em lote, sem abrir a interface.
+
+Exemplos (rodar de dentro de student_management/):
+    python report_cli.py diario --de 2025-11-01 --ate 2025-11-30
+    python report_cli.py mensal --de 2025-01 --ate 2025-12
+    python report_cli.py financeiro --de 2025-01 --ate 2025-03
+    python report_cli.py boletins --de 2025-09 --ate 2025-11 --aluno 3 --aluno 7
+    python report_cli.py fechamento 2025-11 --diarios --saida fechamentos/
+
+Os dados são lidos do banco neste processo e os PDFs são montados em paralelo
+(um processo por núcleo por padrão). Cada relatório vai para um arquivo com o
+período no nome, dentro de --saida. Todos os arquivos de uma execução levam o
+mesmo sufixo de data/hora + aleatório (como os da tela), então rodar de novo
+não sobrescreve os anteriores.
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ALL_COMPLETED, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+from database.db_manager import DatabaseManager
+from database.schedule import fold_text
+from utils.reports import render_report
+from utils.report_sinks import REPORTS_DIR, unique_suffix
+from utils.report_data import (
+    iter_months, collect_scheduled_daily_report, collect_period_report,
+    collect_financial_report, collect_student_reports
+)
+
+def date_arg(value):
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida: {value} (use AAAA-MM-DD)")
+    return value
+
+
+def month_arg(value):
+    try:
+        datetime.strptime(value, '%Y-%m')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"mês inválido: {value} (use AAAA-MM)")
+    return value
+
+
+def slugify(text):
+    return re.sub(r'[^a-z0-9]+', '-', fold_text(text)).strip('-') or "aluno"
+
+
+def month_title(month):
+    return datetime.strptime(month, '%Y-%m').strftime('%B/%Y')
+
+
+# Cada gerador produz (nome do arquivo, tipo do relatório, função que busca os dados).
+# Os dados só são buscados na hora de enviar o job, para não juntar tudo na memória.
+
+def daily_jobs(db, start_date, end_date):
+    day = datetime.strptime(start_date, '%Y-%m-%d')
+    last = datetime.strptime(end_date, '%Y-%m-%d')
+    while day <= last:
+        date_str = day.strftime('%Y-%m-%d')
+        yield f"relatorio_diario_{date_str}.pdf", "daily", lambda d=date_str: collect_scheduled_daily_report(db, d)
+        day += timedelta(days=1)
+
+
+def monthly_jobs(db, start_month, end_month):
+    for month in iter_months(start_month, end_month):
+        title = f"Relatorio Mensal - {month_title(month)}"
+        yield f"relatorio_mensal_{month}.pdf", "monthly", lambda t=title, m=month: collect_period_report(db, t, m, m)
+
+
+def financial_jobs(db, start_month, end_month):
+    for month in iter_months(start_month, end_month):
+        yield f"relatorio_financeiro_{month}.pdf", "financial", lambda m=month: collect_financial_report(db, m)
+
+
+def student_jobs(db, start_month, end_month, student_ids=None):
+    period = start_month if start_month == end_month else f"{start_month}_a_{end_month}"
+    # Um único GROUP BY para todos os boletins do período
+    for student, data in collect_student_reports(db, start_month, end_month, student_ids):
+        filename = f"boletim_{student['id']}_{slugify(student['name'])}_{period}.pdf"
+        yield filename, "student", lambda d=data: d
+
+
+def closing_jobs(db, month, with_daily=False):
+    """Fechamento do mês: frequência geral, financeiro e boletins (e os diários, se pedido)"""
+    yield from monthly_jobs(db, month, month)
+    yield from financial_jobs(db, month, month)
+    yield from student_jobs(db, month, month)
+    if with_daily:
+        start = datetime.strptime(month, '%Y-%m')
+        next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        yield from daily_jobs(db, start.strftime('%Y-%m-%d'), (next_month - timedelta(days=1)).strftime('%Y-%m-%d'))
+
+
+def unique_path(output_dir, filename, used, suffix):
+    """
+    Caminho em output_dir com o sufixo da execução (não colide com execuções
+    anteriores) e que nenhum outro job desta execução usou
+    """
+    base, ext = os.path.splitext(filename)
+    candidate, n = f"{base}_{suffix}{ext}", 2
+    while candidate in used:
+        candidate = f"{base}_{suffix}_{n}{ext}"
+        n += 1
+    used.add(candidate)
+    return os.path.join(output_dir, candidate)
+
+
+def run_jobs(jobs, output_dir, workers):
+    """
+    Busca os dados de cada job e manda montar o PDF no pool de processos.
+    No máximo 2 jobs por processo ficam na fila, para limitar a memória.
+    Retorna (gerados, erros).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    suffix = unique_suffix()
+    used = set()
+    pending = {}
+    done = failed = 0
+
+    def collect_results(return_when):
+        nonlocal done, failed
+        finished, _ = wait(list(pending), return_when=return_when)
+        for future in finished:
+            path = pending.pop(future)
+            try:
+                future.result()
+                done += 1
+                print(f"[ok] {path}")
+            except Exception as ex:
+                failed += 1
+                print(f"[erro] {path}: {ex}")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for filename, kind, collect in jobs:
+            path = unique_path(output_dir, filename, used, suffix)
+            try:
+                data = collect()
+            except Exception as ex:
+                failed += 1
+                print(f"[erro] {path}: {ex}")
+                continue
+            pending[executor.submit(render_report, kind, data, path)] = path
+            if len(pending) >= workers * 2:
+                collect_results(FIRST_COMPLETED)
+        if pending:
+            collect_results(ALL_COMPLETED)
+
+    return done, failed
+
+
+def build_parser():
+    def add_output_options(target, saida=argparse.SUPPRESS, processos=argparse.SUPPRESS):
+        target.add_argument("--saida", default=saida, help="pasta dos PDFs (padrão: relatorios/)")
+        target.add_argument("--processos", type=int, default=processos,
+                            help="processos que montam os PDFs (padrão: um por núcleo)")
+
+    parser = argparse.ArgumentParser(description="Gera relatórios em PDF em lote, sem abrir a interface.")
+    add_output_options(parser, REPORTS_DIR, os.cpu_count() or 1)
+    # As mesmas opções depois do subcomando (report_cli.py fechamento 2025-11 --saida X).
+    # Sem padrão ali (SUPPRESS): senão o subcomando apagaria o valor dado antes dele
+    output = argparse.ArgumentParser(add_help=False)
+    add_output_options(output)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    daily = commands.add_parser("diario", parents=[output], help="presença de cada dia do período")
+    daily.add_argument("--de", dest="start", type=date_arg, required=True, help="AAAA-MM-DD")
+    daily.add_argument("--ate", dest="end", type=date_arg, help="AAAA-MM-DD (padrão: --de)")
+
+    for name, help_text in (("mensal", "frequência de cada mês do período"),
+                            ("financeiro", "receitas x despesas de cada mês do período")):
+        sub = commands.add_parser(name, parents=[output], help=help_text)
+        sub.add_argument("--de", dest="start", type=month_arg, required=True, help="AAAA-MM")
+        sub.add_argument("--ate", dest="end", type=month_arg, help="AAAA-MM (padrão: --de)")
+
+    students = commands.add_parser("boletins", parents=[output], help="um boletim de frequência por aluno no período")
+    students.add_argument("--de", dest="start", type=month_arg, required=True, help="AAAA-MM")
+    students.add_argument("--ate", dest="end", type=month_arg, help="AAAA-MM (padrão: --de)")
+    students.add_argument("--aluno", dest="students", type=int, action="append",
+                          help="id do aluno (pode repetir; padrão: todos os ativos)")
+
+    closing = commands.add_parser("fechamento", parents=[output], help="fechamento do mês: mensal, financeiro e boletins")
+    closing.add_argument("month", type=month_arg, help="AAAA-MM")
+    closing.add_argument("--diarios", action="store_true", help="inclui o diário de cada dia do mês")
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    workers = max(1, args.processos)
+    end = getattr(args, "end", None) or getattr(args, "start", None)
+    if getattr(args, "start", None) and end < args.start:
+        print("O fim do período (--ate) é anterior ao início (--de)")
+        return 2
+
+    db = DatabaseManager()
+    try:
+        if args.command == "diario":
+            jobs = daily_jobs(db, args.start, end)
+        elif args.command == "mensal":
+            jobs = monthly_jobs(db, args.start, end)
+        elif args.command == "financeiro":
+            jobs = financial_jobs(db, args.start, end)
+        elif args.command == "boletins":
+            jobs = student_jobs(db, args.start, end, args.students)
+        else:
+            jobs = closing_jobs(db, args.month, args.diarios)
+
+        started = time.perf_counter()
+        done, failed = run_jobs(jobs, args.saida, workers)
+        print(f"{done} relatório(s) gerado(s) em {time.perf_counter() - started:.1f} s "
+              f"com {workers} processo(s)" + (f", {failed} com erro" if failed else ""))
+        return 1 if failed else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
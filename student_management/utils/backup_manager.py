@@ -1,4 +1,3 @@
-import shutil
 import os
 from datetime import datetime
 from database.db_manager import DatabaseManager
@@ -19,15 +18,16 @@ class BackupManager:
         """Cria uma copia do banco de dados atual"""
         try:
             # Garante que o banco exista
-            if not os.path.exists(self.db_manager.db_path):
+            if not os.path.exists(self.db_manager.db_name):
                 return None
 
             timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
             filename = f"students_backup_{timestamp}.db"
             destination = os.path.join(self.backup_dir, filename)
             
-            # Copia o arquivo
-            shutil.copy2(self.db_manager.db_path, destination)
+            # API de backup do SQLite: copia também o que ainda está no -wal,
+            # sem depender de checkpoint nem de ninguém estar lendo o banco
+            self.db_manager.backup_to(destination)
             return filename
         except Exception as e:
             print(f"Erro ao criar backup: {e}")
@@ -66,9 +66,10 @@ class BackupManager:
             if not os.path.exists(source):
                 return False
             
-            # Fecha a conexao atual se possivel (SQLite lida bem, mas eh bom garantir)
-            # A sobrescrita do arquivo fisico eh o metodo mais bruto mas eficaz para SQLite
-            shutil.copy2(source, self.db_manager.db_path)
+            # Copia pela API de backup para dentro do banco em uso (sem apagar -wal/-shm
+            # nem sobrescrever o arquivo com conexões abertas); depois aplica as
+            # migrações que o backup não tiver e troca a época do cache
+            self.db_manager.restore_from(source)
             return True
         except Exception as e:
             print(f"Erro ao restaurar: {e}")
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+# Família -> arquivo em assets/fonts (Poppins, licença OFL)
+FONT_FILES = {
+    "Poppins": "Poppins-Regular.ttf",
+    "Poppins-Bold": "Poppins-Bold.ttf"
+}
+
+# Usadas quando o arquivo local não existe. Os .ttf da Poppins ainda não estão no
+# repositório (ver assets/fonts/README.txt): até serem adicionados, a primeira
+# tela depende destas URLs e o texto aparece na fonte padrão até o download
+FALLBACK_URLS = {
+    "Poppins": "https://fonts.gstatic.com/s/poppins/v20/pxiByp8kv8JHgFVrLGT9Z1xlFQ.woff2",
+    "Poppins-Bold": "https://fonts.gstatic.com/s/poppins/v20/pxiByp8kv8JHgFVrLCz7Z1xlFQ.woff2"
+}
+
+FONTS_DIR = "fonts"
+CACHE_DIR = "cache"
+MANIFEST_NAME = "manifest.json"
+
+_resolved = {}
+_resolved_lock = threading.Lock()
+
+
+def _file_hash(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_manifest(path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(path, manifest):
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+    except OSError as ex:
+        print(f"Erro ao salvar manifesto de fontes: {ex}")
+
+
+def _hashed_copy(cache_dir, filename, source, digest):
+    """
+    Garante a cópia <nome>.<hash>.<ext> no cache e remove versões antigas.
+    Retorna o nome do arquivo no cache ou None se não der para gravar.
+    """
+    base, ext = os.path.splitext(filename)
+    hashed_name = f"{base}.{digest[:12]}{ext}"
+    target = os.path.join(cache_dir, hashed_name)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        if not os.path.exists(target):
+            shutil.copyfile(source, target)
+        for name in os.listdir(cache_dir):
+            if name != hashed_name and name.startswith(f"{base}.") and name.endswith(ext):
+                os.remove(os.path.join(cache_dir, name))
+    except OSError as ex:
+        print(f"Erro ao preparar cache da fonte {filename}: {ex}")
+        return None
+    return hashed_name
+
+
+def resolve_fonts(assets_dir) -> dict:
+    """
+    Monta o dicionário de page.fonts com as fontes locais de assets/fonts.
+
+    Cada arquivo é servido por um nome com o hash do conteúdo
+    (fonts/cache/Poppins-Regular.<hash>.ttf): o cliente pode guardar a fonte
+    sem revalidar e, se o arquivo mudar, o nome muda junto. O hash fica num
+    manifesto com tamanho e data do arquivo, para não reler as fontes a cada
+    abertura. Fonte sem arquivo local cai na URL do Google Fonts
+    (FALLBACK_URLS), que é o caso enquanto os .ttf não forem adicionados.
+    """
+    assets_dir = os.path.abspath(assets_dir)
+    with _resolved_lock:
+        if assets_dir in _resolved:
+            return dict(_resolved[assets_dir])
+
+        fonts_dir = os.path.join(assets_dir, FONTS_DIR)
+        cache_dir = os.path.join(fonts_dir, CACHE_DIR)
+        manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+        manifest = _load_manifest(manifest_path)
+        changed = False
+        fonts = {}
+
+        for family, filename in FONT_FILES.items():
+            source = os.path.join(fonts_dir, filename)
+            try:
+                info = os.stat(source)
+            except OSError:
+                print(f"Fonte não encontrada: {source} (usando {FALLBACK_URLS[family]})")
+                fonts[family] = FALLBACK_URLS[family]
+                continue
+
+            entry = manifest.get(filename)
+            if not entry or entry.get("size") != info.st_size or entry.get("mtime_ns") != info.st_mtime_ns:
+                entry = {"size": info.st_size, "mtime_ns": info.st_mtime_ns, "sha256": _file_hash(source)}
+                manifest[filename] = entry
+                changed = True
+
+            hashed_name = _hashed_copy(cache_dir, filename, source, entry["sha256"])
+            if hashed_name:
+                fonts[family] = f"/{FONTS_DIR}/{CACHE_DIR}/{hashed_name}"
+            else:
+                # Pasta só de leitura (ex: executável empacotado): usa o arquivo original
+                fonts[family] = f"/{FONTS_DIR}/{filename}"
+
+        if changed:
+            _save_manifest(manifest_path, manifest)
+
+        _resolved[assets_dir] = fonts
+        return dict(fonts)
@@ -1,4 +1,5 @@
 import flet as ft
+from components.render_scheduler import schedule_update
 
 class KeyboardHandler:
     def __init__(self, main_view):
@@ -38,12 +39,8 @@ class KeyboardHandler:
         
         # Mapeia qual view estamos
         current_view_obj = None
-        if view_name == "students":
-            current_view_obj = self.main_view.students_view
-        elif view_name == "free_students":
-            current_view_obj = self.main_view.free_students_view
-        elif view_name == "calendar":
-            current_view_obj = self.main_view.calendar_view
+        if view_name in ("students", "free_students", "calendar"):
+            current_view_obj = self.main_view.get_view(view_name)
             
         # Tenta usar o método close_dialog da view se existir
         if current_view_obj and hasattr(current_view_obj, "close_dialog"):
@@ -51,18 +48,15 @@ class KeyboardHandler:
         else:
             # Fallback genérico (para logout dialog, etc)
             self.page.dialog.open = False
-            self.page.update()
+            schedule_update(self.page)
 
     def handle_new_item(self):
         view = self.main_view.current_view
-        if view == "students": self.main_view.students_view.open_add_dialog(None)
-        elif view == "free_students": self.main_view.free_students_view.open_add_dialog(None)
-        elif view == "calendar": self.main_view.calendar_view.open_add_dialog(None)
-        elif view == "daily_summary": self.main_view.daily_summary_view.load_daily_summary()
+        if view in ("students", "free_students", "calendar"): self.main_view.get_view(view).open_add_dialog(None)
+        elif view == "daily_summary": self.main_view.get_view(view).load_daily_summary()
 
     def handle_save(self):
         if self.page.dialog and self.page.dialog.open:
             view = self.main_view.current_view
-            if view == "students": self.main_view.students_view.save_student(None)
-            elif view == "free_students": self.main_view.free_students_view.save_student(None)
-            elif view == "calendar": self.main_view.calendar_view.save_event(None)
\ No newline at end of file
+            if view in ("students", "free_students"): self.main_view.get_view(view).save_student(None)
+            elif view == "calendar": self.main_view.get_view(view).save_event(None)
\ No newline at end of file
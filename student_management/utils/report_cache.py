@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+
+
+class ReportCache:
+    """
+    Cache de relatórios prontos: dados calculados e bytes do PDF.
+
+    A chave é (tipo, banco, período) e cada entrada guarda a versão dos dados
+    das tabelas usadas (DatabaseManager.data_version, lida de table_versions no
+    próprio banco: vale para qualquer sessão ou conexão, e a última posição é a
+    época do arquivo, sorteada de novo ao restaurar). Enquanto nenhuma mudar,
+    pedir de novo o mesmo relatório devolve o PDF guardado, sem recalcular nem
+    remontar. Ao passar de MAX_ENTRIES entradas ou MAX_BYTES de PDFs, as
+    menos usadas recentemente saem primeiro.
+    """
+
+    MAX_ENTRIES = 32
+    MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, max_entries=None, max_bytes=None):
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self.max_bytes = max_bytes or self.MAX_BYTES
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # chave -> (versão, dados, pdf)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, version):
+        """(dados, pdf ou None) da versão pedida, ou None se não houver"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key, version, data, pdf=None):
+        """Guarda os dados (e o PDF, quando já montado) da versão"""
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None:
+                # Só troca por uma versão mais nova ou pela mesma com o PDF pronto
+                # (épocas diferentes não se comparam: fica a que chegou agora)
+                if current[0][-1:] == version[-1:] and current[0] > version:
+                    return
+                self._drop(key)
+            self._entries[key] = (version, data, pdf)
+            self._bytes += len(pdf) if pdf else 0
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key):
+        _, _, pdf = self._entries.pop(key)
+        self._bytes -= len(pdf) if pdf else 0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / total * 100) if total > 0 else 0
+        }
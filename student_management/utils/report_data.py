@@ -0,0 +1,156 @@
+import calendar
+from datetime import datetime
+
+# Montagem dos dados de cada relatório a partir do banco. Usado pela tela
+# (ReportsView) e pela linha de comando (report_cli.py); não importa Flet.
+
+# Tabelas lidas por cada tipo de relatório (versão dos dados no ReportCache)
+REPORT_TABLES = {
+    "daily": ("students", "attendance"),
+    "monthly": ("students", "attendance"),
+    "financial": ("students", "courses", "expenses"),
+    "student": ("students", "attendance")
+}
+
+
+def month_bounds(start_month, end_month):
+    """('YYYY-MM', 'YYYY-MM') -> primeiro e último dia do período ('YYYY-MM-DD')"""
+    end_year, end_month_num = map(int, end_month.split('-'))
+    last_day = calendar.monthrange(end_year, end_month_num)[1]
+    return f"{start_month}-01", f"{end_month}-{last_day:02d}"
+
+
+def iter_months(start_month, end_month):
+    """Meses 'YYYY-MM' de start_month até end_month (inclusive)"""
+    year, month = map(int, start_month.split('-'))
+    end_year, end_month_num = map(int, end_month.split('-'))
+    while (year, month) <= (end_year, end_month_num):
+        yield f"{year}-{month:02d}"
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+
+
+def collect_daily_report(db, date_str=None):
+    """Presença de todos os alunos no dia 'YYYY-MM-DD' (padrão: hoje)"""
+    date_str = date_str or datetime.now().strftime('%Y-%m-%d')
+    students = db.get_all_students()
+    attendance_map = db.get_attendance_map(date_str)
+
+    report_data = []
+    for s in students:
+        record = attendance_map.get(s['id'])
+        status_code = record[0] if record else None
+        if status_code == 1: status = "Presente"
+        elif status_code == 0: status = "Falta"
+        else: status = "Pendente"
+
+        report_data.append({
+            "name": s['name'],
+            "course": s['course'],
+            "time": s.get('class_time', '-'),
+            "status": status
+        })
+
+    return {
+        "title": f"Relatorio Diario - {datetime.strptime(date_str, '%Y-%m-%d').strftime('%d/%m/%Y')}",
+        "students": report_data,
+        "date": date_str
+    }
+
+
+def collect_scheduled_daily_report(db, date_str):
+    """
+    Presença no dia 'YYYY-MM-DD' só dos alunos com aula naquele dia da semana
+    (grade student_schedule, via get_daily_report_data). Usado para datas
+    passadas, em que "todos os alunos sem registro" viraria uma lista de pendentes falsos.
+    """
+    data = db.get_daily_report_data(date_str)
+    return {
+        "title": f"Relatorio Diario - {datetime.strptime(date_str, '%Y-%m-%d').strftime('%d/%m/%Y')}",
+        "students": [
+            {"name": d['name'], "course": d['course'], "time": d['time'] or '-', "status": d['status']}
+            for d in data['details']
+        ],
+        "date": date_str
+    }
+
+
+def collect_period_report(db, title, start_month, end_month):
+    """Frequência entre dois meses 'YYYY-MM' a partir do consolidado mensal"""
+    start_date, end_date = month_bounds(start_month, end_month)
+
+    students = db.get_all_students()
+    # Totais já agregados por aluno/mês (attendance_monthly)
+    summaries = db.get_monthly_summaries(start_month, end_month)
+    empty_summary = {"present": 0, "absent": 0, "total": 0, "percentage": 0}
+    report_data = []
+
+    for s in students:
+        summary = summaries.get(s['id'], empty_summary)
+        report_data.append({
+            "name": s['name'],
+            "course": s['course'],
+            "present": summary['present'],
+            "absent": summary['absent'],
+            "percentage": f"{summary['percentage']:.0f}%"
+        })
+
+    return {
+        "title": title,
+        "students": report_data,
+        "period": f"{start_date} a {end_date}"
+    }
+
+
+def collect_financial_report(db, month=None):
+    """Receitas (mensalidades dos alunos ativos cadastrados até o fim do mês, por curso) x despesas do mês 'YYYY-MM' (padrão: atual)"""
+    month_date = datetime.strptime(month, '%Y-%m') if month else datetime.now()
+
+    month_key = month_date.strftime('%Y-%m')
+    # Um GROUP BY por curso (catálogo courses), só com os alunos já cadastrados no mês
+    revenue_details = db.get_revenue_by_course(month_key)
+    expenses = [{"name": e['name'], "value": e['amount']} for e in db.get_expenses(month_key)]
+
+    total_revenue = sum(item['value'] for item in revenue_details)
+    total_expenses = sum(e['value'] for e in expenses)
+
+    return {
+        "title": f"Relatorio Financeiro - {month_date.strftime('%B/%Y')}",
+        "revenue_details": revenue_details,
+        "total_revenue": total_revenue,
+        "expenses": expenses,
+        "total_expenses": total_expenses,
+        "net_profit": total_revenue - total_expenses
+    }
+
+
+def collect_student_reports(db, start_month, end_month, student_ids=None):
+    """
+    Boletins de frequência (um por aluno) entre dois meses 'YYYY-MM'.
+    Um único GROUP BY traz os meses de todos os alunos; retorna [(aluno, dados)].
+    """
+    start_date, end_date = month_bounds(start_month, end_month)
+    breakdown = db.get_monthly_breakdown(start_month, end_month)
+    wanted = set(student_ids) if student_ids else None
+
+    reports = []
+    for s in db.get_all_students():
+        if wanted is not None and s['id'] not in wanted:
+            continue
+        months = breakdown.get(s['id'], [])
+        present = sum(m['present'] for m in months)
+        absent = sum(m['absent'] for m in months)
+        total = present + absent
+        reports.append((s, {
+            "title": f"Boletim de Frequencia - {s['name']}",
+            "student": s['name'],
+            "course": s['course'],
+            "schedule": f"{s.get('course_days') or '-'} {s.get('class_time') or ''}".strip(),
+            "period": f"{start_date} a {end_date}",
+            "months": months,
+            "present": present,
+            "absent": absent,
+            "percentage": f"{(present / total * 100) if total > 0 else 0:.0f}%"
+        }))
+    return reports
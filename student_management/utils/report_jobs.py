@@ -0,0 +1,209 @@
+import itertools
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, CancelledError
+from concurrent.futures.process import BrokenProcessPool
+from utils.reports import render_report_bytes
+from utils.report_sinks import FileSink
+from utils.report_cache import ReportCache
+
+
+class ReportJob:
+    """Um relatório pedido pela tela: etapa atual, progresso (0 a 1) e resultado"""
+
+    QUEUED = "Na fila"
+    COLLECTING = "Buscando dados"
+    RENDERING = "Gerando PDF"
+    DONE = "Pronto"
+    FAILED = "Erro"
+    CANCELLED = "Cancelado"
+
+    PROGRESS = {QUEUED: 0.0, COLLECTING: 0.2, RENDERING: 0.6, DONE: 1.0}
+
+    def __init__(self, job_id, title, kind):
+        self.id = job_id
+        self.title = title
+        self.kind = kind
+        self.status = self.QUEUED
+        self.result = None
+        self.error = None
+        self.future = None
+        self.sink = None
+        self.cancel_requested = False
+
+    @property
+    def progress(self) -> float:
+        return self.PROGRESS.get(self.status, 1.0)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (self.DONE, self.FAILED, self.CANCELLED)
+
+
+class ReportJobRunner:
+    """
+    Gera os PDFs de relatório fora da thread da interface.
+
+    Cada pedido passa por duas etapas: collect() busca os dados numa thread (o
+    banco já é seguro entre threads) e o PDF é montado em memória num processo
+    do ProcessPoolExecutor, então vários relatórios pedidos juntos usam núcleos
+    diferentes sem disputar o GIL com a tela. Os bytes voltam para o sink
+    (arquivo ou download, ver utils/report_sinks.py), cujo retorno fica
+    em job.result. A cada mudança de etapa chama on_update(job) (de outra
+    thread: use schedule_update para redesenhar).
+
+    A etapa de dados roda num ThreadPoolExecutor pequeno do próprio runner: as
+    threads são reaproveitadas, então cada uma abre uma única conexão de
+    leitura do pool do banco (uma thread por job deixaria uma conexão aberta
+    a cada relatório).
+
+    cancel() desiste do relatório: se ainda não chegou ao processo ele nem é
+    gerado; se já está sendo montado, o resultado é descartado.
+
+    Com cache_key e version (função que devolve a versão dos dados), o resultado
+    vai para o ReportCache: o mesmo relatório com os dados inalterados é
+    entregue na hora, sem buscar dados nem montar o PDF de novo.
+    """
+
+    # Threads que buscam os dados (o trabalho pesado é o PDF, nos processos)
+    COLLECT_WORKERS = 2
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self._lock = threading.Lock()
+        self._executor = None
+        self._collector = None
+        self._counter = itertools.count(1)
+        self.jobs = {}  # id -> ReportJob (só os que ainda não terminaram)
+        self.cache = ReportCache()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                try:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                except (OSError, NotImplementedError) as ex:
+                    # Ambiente sem multiprocessing (ex: alguns sandboxes): threads
+                    print(f"Processos indisponíveis para relatórios, usando threads: {ex}")
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def _get_collector(self):
+        with self._lock:
+            if self._collector is None:
+                self._collector = ThreadPoolExecutor(max_workers=self.COLLECT_WORKERS,
+                                                     thread_name_prefix="report-collect")
+            return self._collector
+
+    def submit(self, title, kind, collect, sink=None, on_update=None, cache_key=None, version=None) -> ReportJob:
+        """Agenda um relatório: collect() -> dados -> PDF em bytes -> sink.deliver()"""
+        job = ReportJob(next(self._counter), title, kind)
+        job.sink = sink or FileSink()
+        with self._lock:
+            self.jobs[job.id] = job
+
+        self._get_collector().submit(self._run, job, collect, on_update, cache_key, version)
+        return job
+
+    def _set_status(self, job, status, on_update, result=None, error=None):
+        job.status = status
+        job.result = result
+        job.error = error
+        if job.finished:
+            with self._lock:
+                self.jobs.pop(job.id, None)
+        if on_update:
+            try:
+                on_update(job)
+            except Exception as ex:
+                print(f"Erro ao atualizar progresso do relatório: {ex}")
+
+    def _run(self, job, collect, on_update, cache_key=None, version=None):
+        if job.cancel_requested:
+            return self._set_status(job, ReportJob.CANCELLED, on_update)
+
+        key = stamp = cached = None
+        try:
+            if cache_key is not None and version is not None:
+                # Versão lida ANTES de buscar os dados (mesma regra do QueryCache)
+                key, stamp = (job.kind,) + tuple(cache_key), version()
+                cached = self.cache.get(key, stamp)
+            if cached is not None and cached[1] is not None:
+                return self._set_status(job, ReportJob.DONE, on_update,
+                                        result=job.sink.deliver(cached[1], job.kind))
+        except Exception as ex:
+            return self._set_status(job, ReportJob.FAILED, on_update, error=ex)
+
+        self._set_status(job, ReportJob.COLLECTING, on_update)
+        try:
+            data = cached[0] if cached is not None else collect()
+        except Exception as ex:
+            return self._set_status(job, ReportJob.FAILED, on_update, error=ex)
+        if key is not None:
+            self.cache.put(key, stamp, data)
+
+        if job.cancel_requested:
+            return self._set_status(job, ReportJob.CANCELLED, on_update)
+
+        self._set_status(job, ReportJob.RENDERING, on_update)
+        try:
+            job.future = self._get_executor().submit(render_report_bytes, job.kind, data)
+        except (RuntimeError, BrokenProcessPool) as ex:
+            return self._set_status(job, ReportJob.FAILED, on_update, error=ex)
+        job.future.add_done_callback(lambda future: self._finish(job, future, on_update, key, stamp, data))
+
+    def _finish(self, job, future, on_update, key=None, stamp=None, data=None):
+        if job.cancel_requested or future.cancelled():
+            return self._set_status(job, ReportJob.CANCELLED, on_update)
+        try:
+            content = future.result()
+            if key is not None:
+                self.cache.put(key, stamp, data, content)
+            result = job.sink.deliver(content, job.kind)
+        except CancelledError:
+            return self._set_status(job, ReportJob.CANCELLED, on_update)
+        except BrokenProcessPool as ex:
+            # Processo morreu (falta de memória, antivírus...): o próximo pedido recria o pool
+            with self._lock:
+                self._executor = None
+            return self._set_status(job, ReportJob.FAILED, on_update, error=ex)
+        except Exception as ex:
+            return self._set_status(job, ReportJob.FAILED, on_update, error=ex)
+        self._set_status(job, ReportJob.DONE, on_update, result=result)
+
+    def cancel(self, job):
+        """Cancela um relatório pendente (sem efeito se já terminou)"""
+        if job.finished:
+            return
+        job.cancel_requested = True
+        if job.future is not None:
+            job.future.cancel()
+
+    def cancel_all(self):
+        with self._lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            self.cancel(job)
+
+    def shutdown(self, wait=False):
+        """Cancela o que estiver na fila e encerra os processos"""
+        self.cancel_all()
+        with self._lock:
+            executor, self._executor = self._executor, None
+            collector, self._collector = self._collector, None
+        for pool in (executor, collector):
+            if pool is not None:
+                pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_report_runner() -> ReportJobRunner:
+    """Runner compartilhado pelo processo (o pool é criado no primeiro relatório)"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = ReportJobRunner()
+        return _runner
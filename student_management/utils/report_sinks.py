@@ -0,0 +1,98 @@
+import os
+import secrets
+import shutil
+import time
+from datetime import datetime
+from urllib.parse import quote
+from utils.reports import REPORT_PREFIXES, open_report_file
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pasta padrão dos PDFs gravados em disco (tela no desktop e report_cli.py)
+REPORTS_DIR = os.path.join(_PROJECT_ROOT, "relatorios")
+
+# Downloads do modo web: dentro de assets/, servida pelo Flet em /downloads
+DOWNLOADS_ROUTE = "downloads"
+DOWNLOADS_DIR = os.path.join(_PROJECT_ROOT, "assets", DOWNLOADS_ROUTE)
+
+
+def unique_suffix() -> str:
+    """Data/hora + sufixo aleatório: gerações seguidas ou simultâneas não colidem"""
+    return f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{secrets.token_hex(3)}"
+
+
+def report_filename(kind) -> str:
+    """Nome único para o relatório: tipo + data/hora + sufixo aleatório"""
+    return f"relatorio_{REPORT_PREFIXES.get(kind, kind)}_{unique_suffix()}.pdf"
+
+
+class FileSink:
+    """Grava o PDF numa pasta com nome único (relatórios simultâneos não se sobrescrevem)"""
+
+    def __init__(self, directory=REPORTS_DIR):
+        self.directory = directory
+
+    def write(self, name, content: bytes) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        # Grava num temporário e renomeia: ninguém abre um PDF pela metade
+        partial = f"{path}.part"
+        with open(partial, "wb") as f:
+            f.write(content)
+        os.replace(partial, path)
+        return path
+
+    def deliver(self, content: bytes, kind: str) -> str:
+        return self.write(report_filename(kind), content)
+
+    def open(self, result) -> bool:
+        return open_report_file(result)
+
+    def describe(self, result) -> str:
+        return f"Gerado: {result}"
+
+
+class DownloadSink:
+    """
+    Entrega o PDF ao navegador da sessão Flet (modo web).
+
+    O arquivo vai para assets/downloads/<token>/, que o próprio servidor web do
+    Flet já publica (o mesmo endereço e porta da tela, inclusive para quem
+    acessa de outra máquina ou atrás de um proxy). O token aleatório no caminho
+    faz do link o único jeito de chegar ao arquivo, e a cada entrega as pastas
+    com mais de TTL segundos são apagadas.
+    """
+
+    TTL = 15 * 60
+
+    def __init__(self, page, directory=DOWNLOADS_DIR):
+        self.page = page
+        self.directory = directory
+
+    def _remove_expired(self):
+        limit = time.time() - self.TTL
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir() and entry.stat().st_mtime < limit:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            except OSError:
+                pass
+
+    def deliver(self, content: bytes, kind: str) -> str:
+        self._remove_expired()
+        token = secrets.token_urlsafe(16)
+        name = report_filename(kind)
+        FileSink(os.path.join(self.directory, token)).write(name, content)
+        # Caminho relativo à raiz dos assets: o navegador resolve no endereço da própria tela
+        return f"/{DOWNLOADS_ROUTE}/{token}/{quote(name)}"
+
+    def open(self, result) -> bool:
+        self.page.launch_url(result)
+        return True
+
+    def describe(self, result) -> str:
+        return "Relatório pronto para download"
@@ -0,0 +1,53 @@
+import os
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """
+    Mede o tempo de cada etapa da abertura do app (imports, fontes, tema,
+    banco, primeira tela). Só fica ativo com a variável de ambiente
+    SM_PROFILE_STARTUP=1; desligado, stage() e record() não fazem nada.
+    """
+
+    ENV_VAR = "SM_PROFILE_STARTUP"
+
+    @classmethod
+    def env_enabled(cls) -> bool:
+        """True com SM_PROFILE_STARTUP=1 (também liga as medições fora da abertura)"""
+        return os.environ.get(cls.ENV_VAR, "").strip().lower() in ("1", "true", "sim", "yes")
+
+    def __init__(self, started=None, enabled=None):
+        if enabled is None:
+            enabled = self.env_enabled()
+        self.enabled = enabled
+        self.started = started if started is not None else time.perf_counter()
+        self.stages = []  # [(etapa, segundos)] na ordem em que aconteceram
+        self.reported = False
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self.stages.append((name, seconds))
+
+    @contextmanager
+    def stage(self, name):
+        """Mede o bloco como uma etapa: with profiler.stage("banco"): ..."""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def report(self):
+        """Imprime as etapas e o total desde o início (uma vez por execução)"""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        total = time.perf_counter() - self.started
+        print(f"Abertura do app em {total * 1000:.0f} ms:")
+        for name, seconds in self.stages:
+            share = (seconds / total * 100) if total > 0 else 0
+            print(f"  {name:<16} {seconds * 1000:8.1f} ms  ({share:4.1f}%)")
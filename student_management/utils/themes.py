@@ -1,4 +1,5 @@
 import flet as ft
+from components.render_scheduler import schedule_update
 
 class ThemeManager:
     @staticmethod
@@ -51,4 +52,4 @@ class ThemeManager:
         # Se quiser forçar cor de fundo específica além do tema
         # page.bgcolor = config["bgcolor"] 
         
-        page.update()
\ No newline at end of file
+        schedule_update(page)
\ No newline at end of file
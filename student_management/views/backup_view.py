@@ -1,7 +1,9 @@
 import flet as ft
 from utils.backup_manager import BackupManager
 from database.db_manager import DatabaseManager
-from components.common import CustomButton, SnackBarMessage, ConfirmDialog
+from components.common import CustomButton, SnackBarMessage, ConfirmDialog, SkeletonList
+from components.background_loader import BackgroundLoader
+from components.render_scheduler import schedule_update
 
 class BackupView:
     def __init__(self, page: ft.Page, db_manager: DatabaseManager):
@@ -9,11 +11,21 @@ class BackupView:
         self.db = db_manager
         self.backup_manager = BackupManager(db_manager)
         self.backup_list = ft.Column(spacing=10, scroll=ft.ScrollMode.AUTO)
+        self.loader = BackgroundLoader(page)
+        self.loaded = False
+        self.backup_list.controls = [SkeletonList(rows=3)]
         self.load_backups()
 
     def load_backups(self):
+        """Lista a pasta de backups fora da thread da tela; os itens são montados ao chegar"""
+        self.loader.load(
+            "backups", self.backup_manager.get_backups, self.apply_backups,
+            on_error=lambda ex: SnackBarMessage.show(self.page, f"Erro ao listar backups: {ex}", False)
+        )
+
+    def apply_backups(self, backups):
+        self.loaded = True
         self.backup_list.controls.clear()
-        backups = self.backup_manager.get_backups()
 
         if not backups:
             self.backup_list.controls.append(
@@ -25,7 +37,7 @@ class BackupView:
         else:
             for backup in backups:
                 self.backup_list.controls.append(self.create_backup_item(backup))
-        self.page.update()
+        schedule_update(self.page)
 
     def create_backup_item(self, backup):
         return ft.Container(
@@ -55,14 +67,17 @@ class BackupView:
     def confirm_restore(self, backup):
         dialog = ConfirmDialog("Restaurar", f"Isso substituirá os dados atuais pelos de {backup['date']}. Continuar?", 
                              lambda: [self.backup_manager.restore_backup(backup['name']), SnackBarMessage.show(self.page, "Sistema restaurado! Reinicie.", True)])
-        self.page.dialog = dialog; dialog.open = True; self.page.update()
+        self.page.dialog = dialog; dialog.open = True; schedule_update(self.page)
 
     def confirm_delete(self, backup):
         dialog = ConfirmDialog("Excluir", f"Apagar {backup['name']}?", 
                              lambda: [self.backup_manager.delete_backup(backup['name']), self.load_backups(), SnackBarMessage.show(self.page, "Backup apagado.", True)])
-        self.page.dialog = dialog; dialog.open = True; self.page.update()
+        self.page.dialog = dialog; dialog.open = True; schedule_update(self.page)
 
     def build(self):
+        # Carga anterior descartada (saiu da tela antes de terminar): busca de novo
+        if not self.loaded:
+            self.load_backups()
         return ft.Column([
             ft.Container(
                 content=ft.Row([
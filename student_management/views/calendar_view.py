@@ -2,7 +2,9 @@ import flet as ft
 from datetime import datetime, timedelta
 from calendar import monthrange
 from database.db_manager import DatabaseManager
-from components.common import CustomButton, CustomTextField, SnackBarMessage, EventCard
+from components.common import CustomButton, CustomTextField, SnackBarMessage, EventCard, SkeletonList
+from components.background_loader import BackgroundLoader
+from components.render_scheduler import get_render_scheduler, schedule_update
 
 class CalendarView:
     def __init__(self, page: ft.Page, db_manager: DatabaseManager):
@@ -55,15 +57,38 @@ class CalendarView:
             color=ft.colors.ON_SURFACE
         )
         
-        self.build_calendar()
-        self.load_events()
+        self.loader = BackgroundLoader(page)
+        self.loaded = False
+        self.calendar_grid.controls = [SkeletonList(rows=6, height=40, width=292)]
+        self.events_list.controls = [SkeletonList(rows=3)]
+        self.load_month()
+    
+    def load_month(self):
+        """Busca os eventos do mês exibido fora da thread da tela; grade e agenda são montadas ao chegar"""
+        year, month = self.current_date.year, self.current_date.month
+        self.month_year_text.value = self.get_month_year_text()
+        schedule_update(self.page, self.month_year_text)
+        self.loader.load(
+            "month", lambda: (year, month, self.db.get_events_by_month(year, month)), self.apply_month,
+            on_error=lambda ex: SnackBarMessage.show(self.page, f"Erro ao carregar eventos: {ex}", False)
+        )
+
+    def apply_month(self, result):
+        year, month, month_events = result
+        # Trocou de mês enquanto buscava: a carga do mês novo já foi pedida
+        if (year, month) != (self.current_date.year, self.current_date.month):
+            return
+        self.loaded = True
+        self.build_calendar(month_events)
+        self.load_events(month_events)
     
     def get_month_year_text(self):
         months = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
                   "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
         return f"{months[self.current_date.month - 1]} {self.current_date.year}"
     
-    def build_calendar(self):
+    def build_calendar(self, month_events):
+        """Grade do mês exibido com os eventos já buscados (get_events_by_month)"""
         self.calendar_grid.controls.clear()
         
         # Cabeçalho dos dias
@@ -89,7 +114,7 @@ class CalendarView:
         for day in range(1, num_days + 1):
             date = datetime(year, month, day)
             is_today = date.date() == datetime.now().date()
-            day_events = self.get_events_for_date(date)
+            day_events = month_events.get(date.strftime('%Y-%m-%d'), [])
             has_events = len(day_events) > 0
             
             # Lógica de Cores do Tema
@@ -127,32 +152,33 @@ class CalendarView:
             self.calendar_grid.controls.append(ft.Row(week + [ft.Container(width=40, height=40)]*(7-len(week)), spacing=2))
         
         self.month_year_text.value = self.get_month_year_text()
-        self.page.update()
+        schedule_update(self.page)
     
     def get_events_for_date(self, date):
-        date_str = date.strftime('%Y-%m-%d')
-        return [e for e in self.db.get_events() if e['event_date'] == date_str]
+        month_events = self.db.get_events_by_month(date.year, date.month)
+        return month_events.get(date.strftime('%Y-%m-%d'), [])
     
     def previous_month(self, e):
         first = self.current_date.replace(day=1)
         self.current_date = (first - timedelta(days=1)).replace(day=1)
-        self.build_calendar()
+        self.load_month()
     
     def next_month(self, e):
         last_day = monthrange(self.current_date.year, self.current_date.month)[1]
         self.current_date = (self.current_date.replace(day=last_day) + timedelta(days=1))
-        self.build_calendar()
+        self.load_month()
     
-    def load_events(self):
+    def load_events(self, month_events):
+        """Agenda do mês exibido (os mesmos eventos usados pela grade do calendário)"""
         self.events_list.controls.clear()
-        events = self.db.get_events() # Pode filtrar por mês aqui se quiser
+        events = [event for day_events in month_events.values() for event in day_events]
         
         if not events:
             self.events_list.controls.append(
                 ft.Container(
                     content=ft.Column([
                         ft.Icon(ft.icons.EVENT_BUSY, size=60, color=ft.colors.OUTLINE),
-                        ft.Text("Sem eventos recentes", size=14, color=ft.colors.ON_SURFACE_VARIANT)
+                        ft.Text("Sem eventos neste mês", size=14, color=ft.colors.ON_SURFACE_VARIANT)
                     ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
                     alignment=ft.alignment.center,
                     padding=20
@@ -163,7 +189,7 @@ class CalendarView:
             events.sort(key=lambda x: x['event_date'], reverse=True)
             for event in events:
                 self.events_list.controls.append(EventCard(event, self.confirm_delete_event, self.edit_event))
-        self.page.update()
+        schedule_update(self.page)
 
     # --- LÓGICA DE DIÁLOGOS E FORMULÁRIOS (Similar ao padrão anterior) ---
     def open_add_dialog(self, e):
@@ -205,21 +231,21 @@ class CalendarView:
         )
         self.page.dialog = self.event_dialog
         self.event_dialog.open = True
-        self.page.update()
+        schedule_update(self.page)
 
     def close_dialog(self):
         if self.page.dialog:
             self.page.dialog.open = False
-            self.page.update()
+            schedule_update(self.page)
 
     def open_date_picker(self):
         self.page.overlay.clear()
         dp = ft.DatePicker(
-            on_change=lambda e: [setattr(self, 'event_date', e.control.value), setattr(self.date_button, 'text', f"Data: {e.control.value.strftime('%d/%m/%Y')}"), self.page.update()],
+            on_change=lambda e: [setattr(self, 'event_date', e.control.value), setattr(self.date_button, 'text', f"Data: {e.control.value.strftime('%d/%m/%Y')}"), schedule_update(self.page)],
             first_date=datetime(2023,1,1)
         )
         self.page.overlay.append(dp)
-        self.page.update()
+        get_render_scheduler(self.page).update_now()
         dp.pick_date()
 
     def save_event(self, e):
@@ -236,17 +262,19 @@ class CalendarView:
             SnackBarMessage.show(self.page, "Evento atualizado!", True)
         
         self.close_dialog()
-        self.load_events()
-        self.build_calendar()
+        self.load_month()
 
     def confirm_delete_event(self, event):
         from components.common import ConfirmDialog
-        dialog = ConfirmDialog("Excluir", f"Apagar '{event['title']}'?", lambda: [self.db.delete_event(event['id']), self.load_events(), self.build_calendar(), SnackBarMessage.show(self.page, "Excluído!", True)])
+        dialog = ConfirmDialog("Excluir", f"Apagar '{event['title']}'?", lambda: [self.db.delete_event(event['id']), self.load_month(), SnackBarMessage.show(self.page, "Excluído!", True)])
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        schedule_update(self.page)
 
     def build(self):
+        # Carga anterior descartada (saiu da tela antes de terminar): busca de novo
+        if not self.loaded:
+            self.load_month()
         return ft.Row([
             # Painel Calendário
             ft.Container(
@@ -1,54 +1,117 @@
 import flet as ft
 from datetime import datetime
 from database.db_manager import DatabaseManager
-from components.common import StudentCard, SnackBarMessage
+from components.common import StudentCard, SnackBarMessage, SkeletonList
+from components.background_loader import BackgroundLoader
+from components.keyed_list import KeyedList
 
 class DailySummaryView:
     def __init__(self, page: ft.Page, db_manager: DatabaseManager):
         self.page = page
         self.db = db_manager
         self.summary_column = ft.Column(spacing=10, scroll=ft.ScrollMode.AUTO)
-        self.load_daily_summary()
+        self.summary_items = KeyedList(self.summary_column)
+        self.loader = BackgroundLoader(page)
+        self.attendance_map = {}
+        self.todays_students = []
+        # Marcações otimistas ainda não confirmadas pelo banco: id -> [present]
+        self.pending = {}
+        # Marcações já gravadas: id -> (registro, versão de attendance após o commit)
+        self.confirmed = {}
+        # A primeira carga acontece no build(), em segundo plano
+        self.summary_column.controls = [SkeletonList()]
     
     def load_daily_summary(self):
-        self.summary_column.controls.clear()
-        
+        """Busca o resumo do dia fora da thread da tela; o resultado é aplicado ao chegar"""
+        self.loader.load(
+            "summary", self.fetch_daily_summary, self.apply_daily_summary,
+            on_error=lambda ex: SnackBarMessage.show(self.page, f"Erro ao carregar o dia: {ex}", False)
+        )
+
+    def fetch_daily_summary(self):
+        # Versão lida ANTES das consultas: diz quais gravações esta leitura já enxerga
+        version = self.db.data_version('attendance')
         now = datetime.now()
-        today_str = now.strftime('%Y-%m-%d')
-        days_map = {0: 'seg', 1: 'ter', 2: 'qua', 3: 'qui', 4: 'sex', 5: 'sab', 6: 'dom'}
-        today_key = days_map[now.weekday()]
-        
-        all_students = self.db.get_all_students()
-        todays_students = [
-            s for s in all_students 
-            if today_key in s['course_days'].lower()
-        ]
-        todays_students.sort(key=lambda x: x.get('class_time', 'zz'))
+        # Consulta indexada na grade semanal (já vem ordenada por horário)
+        todays_students = self.db.get_students_for_weekday(now.weekday())
+        attendance_map = self.db.get_attendance_map(now.strftime('%Y-%m-%d'))
+        return todays_students, attendance_map, version
+
+    def apply_daily_summary(self, result):
+        """Aplica uma leitura nova do banco"""
+        todays_students, attendance_map, version = result
+        self.todays_students = todays_students
+        # Uma carga iniciada antes de um commit ainda traz o dado antigo:
+        # as marcações gravadas depois da versão lida continuam valendo
+        newer = {}
+        for student_id, (record, written) in list(self.confirmed.items()):
+            if self.db.data_version_covers(version, written):
+                self.confirmed.pop(student_id, None)
+            else:
+                newer[student_id] = record
+        if newer:
+            attendance_map = {**attendance_map, **newer}
+        self.attendance_map = attendance_map
+        self.render_daily_summary()
+
+    def attendance_status(self, student_id):
+        """1 = presente, 0 = falta, None = pendente (marcações ainda na fila já contam)"""
+        pending = self.pending.get(student_id)
+        if pending is not None:
+            return 1 if pending[0] else 0
+        record = self.attendance_map.get(student_id)
+        return record[0] if record else None
+
+    def render_daily_summary(self):
+        """
+        Reconcilia o resumo do dia por chave (cabeçalho, horários e alunos):
+        marcar um aluno recria só o card dele e o cabeçalho de contagem.
+        """
+        todays_students = self.todays_students
         
         total = len(todays_students)
         present_count = 0
         absent_count = 0
         
-        student_cards = []
+        # Agrupa por horário (a lista já vem ordenada) para a chamada da turma inteira
+        slots = {}
+        for student in todays_students:
+            slots.setdefault(student.get('class_time') or 'Sem horário', []).append(student)
+        
+        student_items = []
         for student in todays_students:
-            attendance = self.db.get_attendance_by_date(student['id'], today_str)
+            slot_time = student.get('class_time') or 'Sem horário'
+            if slot_time in slots:
+                slot_students = slots.pop(slot_time)
+                student_items.append((
+                    ('slot', slot_time),
+                    tuple(s['id'] for s in slot_students),
+                    lambda t=slot_time, ss=slot_students: self.build_slot_header(t, ss)
+                ))
+            
+            attendance = self.attendance_status(student['id'])
             if attendance is not None:
                 if attendance == 1: present_count += 1
                 else: absent_count += 1
             
-            card = StudentCard(
-                student=student,
-                on_edit=None,
-                on_delete=None,
-                on_attendance=None,
-                show_quick_attendance=True,
-                attendance_marked=(attendance is not None),
-                on_quick_present=self.mark_quick_present,
-                on_quick_absent=self.mark_quick_absent
-            )
-            student_cards.append(card)
+            student_items.append((
+                ('student', student['id']),
+                (tuple(student.items()), attendance is not None),
+                lambda s=student, marked=(attendance is not None): self.build_student_card(s, marked)
+            ))
 
-        header = ft.Container(
+        counts = (total, present_count, absent_count)
+        items = [('header', counts, lambda: self.build_header(*counts))]
+        
+        if not todays_students:
+            items.append(('empty', None, self.build_empty_state))
+        else:
+            items.extend(student_items)
+            
+        self.summary_items.sync(items)
+
+    def build_header(self, total, present_count, absent_count):
+        return ft.Container(
             content=ft.Row([
                 self.create_stat("Total", total, ft.colors.ON_PRIMARY_CONTAINER),
                 self.create_stat("Presentes", present_count, ft.colors.GREEN),
@@ -60,24 +123,29 @@ class DailySummaryView:
             border_radius=15,
             border=ft.border.all(1, ft.colors.OUTLINE_VARIANT)
         )
-        
-        self.summary_column.controls.append(header)
-        
-        if not todays_students:
-            self.summary_column.controls.append(
-                ft.Container(
-                    content=ft.Column([
-                        ft.Icon(ft.icons.BEDTIME, size=50, color=ft.colors.OUTLINE),
-                        ft.Text("Nenhum aluno hoje. Bom descanso!", color=ft.colors.ON_SURFACE_VARIANT)
-                    ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
-                    alignment=ft.alignment.center,
-                    padding=40
-                )
-            )
-        else:
-            self.summary_column.controls.extend([ft.Container(c) for c in student_cards])
-            
-        self.page.update()
+
+    def build_empty_state(self):
+        return ft.Container(
+            content=ft.Column([
+                ft.Icon(ft.icons.BEDTIME, size=50, color=ft.colors.OUTLINE),
+                ft.Text("Nenhum aluno hoje. Bom descanso!", color=ft.colors.ON_SURFACE_VARIANT)
+            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+            alignment=ft.alignment.center,
+            padding=40
+        )
+
+    def build_student_card(self, student, attendance_marked):
+        card = StudentCard(
+            student=student,
+            on_edit=None,
+            on_delete=None,
+            on_attendance=None,
+            show_quick_attendance=True,
+            attendance_marked=attendance_marked,
+            on_quick_present=self.mark_quick_present,
+            on_quick_absent=self.mark_quick_absent
+        )
+        return ft.Container(card)
 
     def create_stat(self, label, value, color):
         return ft.Column([
@@ -85,19 +153,66 @@ class DailySummaryView:
             ft.Text(label, size=12, color=ft.colors.ON_PRIMARY_CONTAINER)
         ], horizontal_alignment=ft.CrossAxisAlignment.CENTER)
 
-    def mark_quick_present(self, student):
+    def build_slot_header(self, slot_time, slot_students):
+        return ft.Row([
+            ft.Icon(ft.icons.ACCESS_TIME, color=ft.colors.PRIMARY, size=18),
+            ft.Text(slot_time, weight=ft.FontWeight.BOLD, color=ft.colors.ON_SURFACE, expand=True),
+            ft.TextButton("Todos presentes", icon=ft.icons.DONE_ALL, on_click=lambda e: self.mark_slot(slot_students, True)),
+            ft.TextButton("Todos com falta", icon=ft.icons.REMOVE_DONE, on_click=lambda e: self.mark_slot(slot_students, False)),
+        ])
+
+    def mark_slot(self, students, present):
+        """Marca todos os pendentes do horário numa única transação"""
         today = datetime.now().strftime('%Y-%m-%d')
-        if self.db.mark_attendance(student['id'], today, True):
-            SnackBarMessage.show(self.page, f"Presença: {student['name']}", True)
-            self.load_daily_summary()
+        pending = [s for s in students if self.attendance_status(s['id']) is None]
+        if not pending:
+            SnackBarMessage.show(self.page, "Todos já foram marcados!", False)
+            return
+        
+        count = self.db.mark_attendance_bulk([(s['id'], today, present) for s in pending])
+        SnackBarMessage.show(self.page, f"{'Presença' if present else 'Falta'} para {count} alunos", present)
+        self.load_daily_summary()
+
+    def mark_quick_present(self, student):
+        self.mark_quick(student, True)
 
     def mark_quick_absent(self, student):
+        self.mark_quick(student, False)
+
+    def mark_quick(self, student, present):
+        """
+        Marcação otimista: o card e os contadores mudam na hora e a gravação vai
+        para a fila em lote. Se falhar, a marcação é desfeita com um aviso.
+        """
+        student_id = student['id']
         today = datetime.now().strftime('%Y-%m-%d')
-        if self.db.mark_attendance(student['id'], today, False):
-            SnackBarMessage.show(self.page, f"Falta: {student['name']}", False)
-            self.load_daily_summary()
+        entry = [present]
+        self.pending[student_id] = entry
+        self.render_daily_summary()
+        SnackBarMessage.show(self.page, f"{'Presença' if present else 'Falta'}: {student['name']}", present)
+
+        def saved():
+            if self.pending.get(student_id) is not entry:
+                return
+            # Gravado: a marcação passa para o mapa do dia (cópia: o mapa vem do
+            # cache do banco) e só o card do aluno é reconciliado, sem reler o dia
+            record = (1 if present else 0, "")
+            self.confirmed[student_id] = (record, self.db.data_version('attendance'))
+            self.attendance_map = {**self.attendance_map, student_id: record}
+            self.pending.pop(student_id, None)
+            self.render_daily_summary()
+
+        def failed(ex):
+            if self.pending.get(student_id) is entry:
+                self.pending.pop(student_id, None)
+            self.render_daily_summary()
+            SnackBarMessage.show(self.page, f"Não foi possível salvar {student['name']}: marcação desfeita", False)
+
+        self.db.queue_attendance(student_id, today, present, on_done=saved, on_error=failed)
 
     def build(self):
+        # Recarrega a cada visita (só o que mudou é reenviado para a tela)
+        self.load_daily_summary()
         return ft.Column([
             ft.Container(
                 content=ft.Row([
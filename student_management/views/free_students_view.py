@@ -1,38 +1,43 @@
 import flet as ft
 from database.db_manager import DatabaseManager
 from components.common import CustomButton, CustomTextField, SnackBarMessage, ConfirmDialog, FreeStudentCard
+from components.keyed_list import KeyedList
+from components.render_scheduler import schedule_update
 
 class FreeStudentsView:
     def __init__(self, page: ft.Page, db_manager: DatabaseManager):
         self.page = page
         self.db = db_manager
         self.students_list = ft.Column(spacing=15, scroll=ft.ScrollMode.AUTO)
+        # Reconciliação por horário da turma
+        self.turma_items = KeyedList(self.students_list)
+        self.empty_state = self.build_empty_state()
         self.load_students()
     
     def load_students(self):
-        self.students_list.controls.clear()
+        """Reconcilia as turmas: só a turma cujos alunos mudaram é recriada"""
         students = self.db.get_all_free_students()
         
-        if not students:
-            self.students_list.controls.append(
-                ft.Container(
-                    content=ft.Column([
-                        ft.Icon(ft.icons.PERSON_OFF, size=80, color=ft.colors.OUTLINE),
-                        ft.Text("Nenhum aluno gratuito ativo", size=16, color=ft.colors.ON_SURFACE_VARIANT),
-                    ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
-                    alignment=ft.alignment.center,
-                    padding=50
-                )
-            )
-        else:
-            turmas = {}
-            for s in students:
-                turmas.setdefault(s['class_time'], []).append(s)
-            
-            for time in sorted(turmas.keys()):
-                self.students_list.controls.append(self.build_turma_card(time, turmas[time]))
-        
-        self.page.update()
+        turmas = {}
+        for s in students:
+            turmas.setdefault(s['class_time'], []).append(s)
+
+        items = []
+        for time in sorted(turmas.keys()):
+            signature = tuple(tuple(s.items()) for s in turmas[time])
+            items.append((time, signature, lambda t=time: self.build_turma_card(t, turmas[t])))
+
+        self.turma_items.sync(items, empty_control=self.empty_state)
+
+    def build_empty_state(self):
+        return ft.Container(
+            content=ft.Column([
+                ft.Icon(ft.icons.PERSON_OFF, size=80, color=ft.colors.OUTLINE),
+                ft.Text("Nenhum aluno gratuito ativo", size=16, color=ft.colors.ON_SURFACE_VARIANT),
+            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+            alignment=ft.alignment.center,
+            padding=50
+        )
     
     def build_turma_card(self, time, students):
         header = ft.Container(
@@ -90,7 +95,7 @@ class FreeStudentsView:
                 self.db.create_free_student(name_field.value, phone_field.value, time_dd.value, lesson_dd.value)
             
             self.page.dialog.open = False
-            self.page.update()
+            schedule_update(self.page)
             self.load_students()
             SnackBarMessage.show(self.page, "Salvo com sucesso!", True)
 
@@ -109,17 +114,17 @@ class FreeStudentsView:
         dialog = ft.AlertDialog(
             title=ft.Text("Editar Aluno" if is_edit else "Novo Aluno Gratuito"),
             content=ft.Column([name_field, phone_field, time_dd, lesson_dd, info_box], tight=True, spacing=15),
-            actions=[ft.TextButton("Cancelar", on_click=lambda e: setattr(self.page.dialog, 'open', False) or self.page.update()), ft.FilledButton("Salvar", on_click=save)]
+            actions=[ft.TextButton("Cancelar", on_click=lambda e: setattr(self.page.dialog, 'open', False) or schedule_update(self.page)), ft.FilledButton("Salvar", on_click=save)]
         )
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        schedule_update(self.page)
 
     def confirm_delete(self, student):
         dialog = ConfirmDialog("Excluir", f"Remover {student['name']}?", lambda: [self.db.delete_free_student(student['id']), self.load_students()])
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        schedule_update(self.page)
 
     def promote_student(self, student):
         course_field = CustomTextField("Curso", width=300)
@@ -134,7 +139,7 @@ class FreeStudentsView:
                 SnackBarMessage.show(self.page, f"{student['name']} promovido!", True)
                 self.page.dialog.open = False
                 self.load_students()
-                self.page.update()
+                schedule_update(self.page)
         
         dialog = ft.AlertDialog(
             modal=True,
@@ -145,13 +150,13 @@ class FreeStudentsView:
                 days_field,
             ], tight=True, spacing=15),
             actions=[
-                ft.TextButton("Cancelar", on_click=lambda e: setattr(self.page.dialog, 'open', False) or self.page.update()),
+                ft.TextButton("Cancelar", on_click=lambda e: setattr(self.page.dialog, 'open', False) or schedule_update(self.page)),
                 ft.TextButton("Promover", on_click=confirm_promote),
             ],
         )
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        schedule_update(self.page)
 
     def build(self):
         return ft.Column([
@@ -1,6 +1,7 @@
 import flet as ft
 from utils.auth import AuthManager
 from components.common import SnackBarMessage
+from components.render_scheduler import schedule_update
 
 class LoginView:
     def __init__(self, page: ft.Page, auth_manager: AuthManager, on_login_success):
@@ -73,7 +74,7 @@ class LoginView:
 
     def show_error(self, message):
         self.error_text.value = message
-        self.error_text.update()
+        schedule_update(self.page, self.error_text)
         # Pequena animação de "tremor" ou flash poderia ser adicionada aqui
 
     def open_forgot_password_dialog(self, e):
@@ -89,7 +90,7 @@ class LoginView:
             if self.auth.reset_password(d_user.value, d_pass.value, d_key.value):
                 SnackBarMessage.show(self.page, "Senha redefinida com sucecco!", True)
                 self.page.dialog.open = False
-                self.page.update()
+                schedule_update(self.page)
             else:
                 SnackBarMessage.show(self.page, "Falha: Chave incorreta ou usuário inexistente.")
             
@@ -102,14 +103,14 @@ class LoginView:
                 d_key
             ], tight = True),
             actions=[
-                ft.TextButton("Cancelar", on_click=lambda e: setattr(self.page.dialog, 'open', False) or self.page.update()),
+                ft.TextButton("Cancelar", on_click=lambda e: setattr(self.page.dialog, 'open', False) or schedule_update(self.page)),
                 ft.ElevatedButton("Redefinir", on_click=confirm_reset, bgcolor=ft.colors.RED_600, color=ft.colors.WHITE)
             ]
         )
 
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        schedule_update(self.page)
 
 
     def build(self):
@@ -1,4 +1,6 @@
 import flet as ft
+import threading
+import time
 from datetime import datetime, timedelta
 from database.db_manager import DatabaseManager
 from views.students_view import StudentsView
@@ -11,25 +13,38 @@ from views.backup_view import BackupView
 from views.settings_view import SettingsView
 from views.profile_view import TeacherProfileView
 from utils.keyboard_shortcuts import KeyboardHandler
-from components.common import ConfirmDialog
+from components.common import ConfirmDialog, SkeletonList
+from components.background_loader import BackgroundLoader
+from components.render_scheduler import schedule_update
 
 class MainView:
-    def __init__(self, page: ft.Page, db_manager: DatabaseManager, username: str, on_logout, on_theme_change):
+    # Views criadas em segundo plano logo depois da primeira tela (as mais acessadas)
+    PREWARM_VIEWS = ("students", "organized")
+
+    def __init__(self, page: ft.Page, db_manager: DatabaseManager, username: str, on_logout, on_theme_change, prewarm=True):
         self.page = page
         self.db = db_manager
         self.username = username
         self.on_logout = on_logout
         
-        # Inicializa Views
-        self.students_view = StudentsView(page, db_manager)
-        self.free_students_view = FreeStudentsView(page, db_manager)
-        self.organized_view = OrganizedStudentsView(page, db_manager)
-        self.calendar_view = CalendarView(page, db_manager)
-        self.reports_view = ReportsView(page, db_manager)
-        self.daily_summary_view = DailySummaryView(page, db_manager)
-        self.backup_view = BackupView(page, db_manager)
-        self.settings_view = SettingsView(page, on_theme_change)
-        self.profile_view = TeacherProfileView(page, db_manager, username)
+        # Registro de views: cada uma é criada na primeira navegação e reaproveitada
+        # (os construtores já consultam o banco, então não vale criar todas no login)
+        self.view_factories = {
+            "daily_summary": lambda: DailySummaryView(page, db_manager),
+            "organized": lambda: OrganizedStudentsView(page, db_manager),
+            "students": lambda: StudentsView(page, db_manager),
+            "free_students": lambda: FreeStudentsView(page, db_manager),
+            "calendar": lambda: CalendarView(page, db_manager),
+            "reports": lambda: ReportsView(page, db_manager),
+            "backup": lambda: BackupView(page, db_manager),
+            "settings": lambda: SettingsView(page, on_theme_change),
+            "profile": lambda: TeacherProfileView(page, db_manager, username),
+        }
+        self._views = {}
+        self._views_lock = threading.RLock()
+        self.view_build_times = {}
+        # Cargas do dashboard (as demais views têm o próprio loader)
+        self.loader = BackgroundLoader(page)
         
         # Atalhos
         self.keyboard_handler = KeyboardHandler(self)
@@ -41,11 +56,44 @@ class MainView:
         self.nav_rail = None
         
         self.update_content()
-    
+
+        if prewarm:
+            self.page.run_thread(self.prewarm, *self.PREWARM_VIEWS)
+
+    def get_view(self, name: str):
+        """Retorna a view pelo nome, criando-a na primeira vez"""
+        with self._views_lock:
+            view = self._views.get(name)
+            if view is None:
+                started = time.perf_counter()
+                view = self.view_factories[name]()
+                self.view_build_times[name] = (time.perf_counter() - started) * 1000
+                self._views[name] = view
+            return view
+
+    def prewarm(self, *names):
+        """Cria views em segundo plano para que a primeira navegação até elas seja imediata"""
+        for name in names:
+            try:
+                self.get_view(name)
+            except Exception as ex:
+                print(f"Erro ao preparar a view '{name}': {ex}")
+
+    def cancel_loads(self, view_name: str):
+        """Descarta as cargas em segundo plano pendentes da view que está saindo da tela"""
+        if view_name == "dashboard":
+            self.loader.cancel()
+            return
+        loader = getattr(self._views.get(view_name), "loader", None)
+        if loader is not None:
+            loader.cancel()
+
     def navigate_to(self, view_name: str):
+        if view_name != self.current_view:
+            self.cancel_loads(self.current_view)
         self.current_view = view_name
         self.update_content()
-        self.page.update()
+        schedule_update(self.page)
 
     def navigate_to_index(self, index: int):
         views_map = [
@@ -56,7 +104,7 @@ class MainView:
         if 0 <= index < len(views_map):
             if self.nav_rail:
                 self.nav_rail.selected_index = index
-                self.nav_rail.update()
+                schedule_update(self.page, self.nav_rail)
             self.navigate_to(views_map[index])
 
     def confirm_logout(self):
@@ -67,49 +115,51 @@ class MainView:
         )
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        schedule_update(self.page)
 
     def update_content(self):
         self.page.dialog = None
         
-        if self.current_view == "daily_summary":
-            self.content_container.content = self.daily_summary_view.build()
-        elif self.current_view == "dashboard":
+        if self.current_view == "dashboard":
             self.content_container.content = self.build_dashboard()
-        elif self.current_view == "organized":
-            self.content_container.content = self.organized_view.build()
-        elif self.current_view == "students":
-            self.content_container.content = self.students_view.build()
-        elif self.current_view == "free_students":
-            self.content_container.content = self.free_students_view.build()
-        elif self.current_view == "calendar":
-            self.content_container.content = self.calendar_view.build()
-        elif self.current_view == "reports":
-            self.content_container.content = self.reports_view.build()
-        elif self.current_view == "backup":
-            self.content_container.content = self.backup_view.build()
-        elif self.current_view == "settings":
-            self.content_container.content = self.settings_view.build()
-        elif self.current_view == "profile":
-            self.profile_view = TeacherProfileView(self.page, self.db, self.username)
-            self.content_container.content = self.profile_view.build()
+        elif self.current_view in self.view_factories:
+            if self.current_view == "profile":
+                # Perfil sempre com estatísticas e nota atualizadas
+                with self._views_lock:
+                    self._views.pop("profile", None)
+            self.content_container.content = self.get_view(self.current_view).build()
         
-        self.page.update()
+        schedule_update(self.page)
     
     def build_dashboard(self):
-        """Constrói a tela de dashboard completa"""
+        """Constrói a tela de dashboard: os números chegam em segundo plano"""
+        stats_holder = ft.Container(
+            content=ft.Row([SkeletonList(rows=1, height=110, width=240) for _ in range(4)], spacing=20, wrap=True)
+        )
+
+        def apply(stats):
+            stats_holder.content = self.build_stats_row(*stats)
+            if stats_holder.page is not None:
+                schedule_update(self.page, stats_holder)
+
+        self.loader.load("dashboard", self.fetch_dashboard_stats, apply)
+        return self.build_dashboard_layout(stats_holder)
+
+    def fetch_dashboard_stats(self):
+        """Busca os números do dashboard (roda fora da thread da tela)"""
         # 1. Busca Dados Gerais
         students = self.db.get_all_students()
         total_students = len(students)
         free_students = self.db.get_all_free_students()
         total_free_students = len(free_students)
         
-        # 2. Calcula Presença Média
+        # 2. Calcula Presença Média (um GROUP BY para todos os alunos)
+        summaries = self.db.get_attendance_summaries()
         total_percentage = 0
         count_active = 0
         for student in students:
-            summary = self.db.get_attendance_summary(student['id'])
-            if summary['total'] > 0:
+            summary = summaries.get(student['id'])
+            if summary and summary['total'] > 0:
                 total_percentage += summary['percentage']
                 count_active += 1
         
@@ -120,6 +170,17 @@ class MainView:
         future_date = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
         events = self.db.get_events(today, future_date)
         
+        return total_students, total_free_students, avg_attendance, len(events)
+
+    def build_stats_row(self, total_students, total_free_students, avg_attendance, upcoming_events):
+        return ft.Row([
+            self.create_stat_card("Total de Alunos", str(total_students), ft.icons.PEOPLE, ft.colors.PRIMARY),
+            self.create_stat_card("Alunos Gratuitos", str(total_free_students), ft.icons.PEOPLE, ft.colors.TERTIARY),
+            self.create_stat_card("Presença Média", f"{avg_attendance:.1f}%", ft.icons.TIMELINE, ft.colors.SECONDARY),
+            self.create_stat_card("Eventos Próximos", str(upcoming_events), ft.icons.EVENT_NOTE, ft.colors.ERROR),
+        ], spacing=20, wrap=True, alignment=ft.MainAxisAlignment.START)
+
+    def build_dashboard_layout(self, stats_holder):
         return ft.Column([
             # Cabeçalho
             ft.Container(
@@ -131,12 +192,7 @@ class MainView:
             ),
             
             # Linha de Estatísticas (Cards Coloridos)
-            ft.Row([
-                self.create_stat_card("Total de Alunos", str(total_students), ft.icons.PEOPLE, ft.colors.PRIMARY),
-                self.create_stat_card("Alunos Gratuitos", str(total_free_students), ft.icons.PEOPLE, ft.colors.TERTIARY),
-                self.create_stat_card("Presença Média", f"{avg_attendance:.1f}%", ft.icons.TIMELINE, ft.colors.SECONDARY),
-                self.create_stat_card("Eventos Próximos", str(len(events)), ft.icons.EVENT_NOTE, ft.colors.ERROR),
-            ], spacing=20, wrap=True, alignment=ft.MainAxisAlignment.START),
+            stats_holder,
             
             ft.Divider(height=40, color=ft.colors.OUTLINE_VARIANT),
             
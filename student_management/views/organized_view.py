@@ -1,44 +1,68 @@
 import flet as ft
 from datetime import datetime
 from database.db_manager import DatabaseManager
-from components.common import SnackBarMessage
-from collections import defaultdict
+from components.common import SnackBarMessage, SkeletonList
+from components.background_loader import BackgroundLoader
+from components.render_scheduler import schedule_update
 
 class OrganizedStudentsView:
     def __init__(self, page: ft.Page, db_manager: DatabaseManager):
         self.page = page
         self.db = db_manager
         self.organized_view = ft.Column(spacing=15, scroll=ft.ScrollMode.AUTO)
+        self.attendance_today = {}
+        # Marcações otimistas: id -> [present, versão de attendance após o commit (None = na fila)]
+        self.pending = {}
+        # Containers dos mini cards por aluno (o mesmo aluno aparece em vários dias)
+        self.mini_card_holders = {}
+        self.loader = BackgroundLoader(page)
+        self.loaded = False
+        self.organized_view.controls = [SkeletonList(rows=5)]
         self.load_organized_students()
     
     def organize_students_by_day_time(self, students):
-        organized = defaultdict(lambda: defaultdict(list))
-        days_order = {
-            'segunda': 1, 'seg': 1, 'terça': 2, 'ter': 2,
-            'quarta': 3, 'qua': 3, 'quinta': 4, 'qui': 4,
-            'sexta': 5, 'sex': 5, 'sábado': 6, 'sáb': 6, 'sab': 6,
-            'domingo': 7, 'dom': 7
-        }
-        
-        for student in students:
-            days_text = student['course_days'].lower()
-            time_text = student.get('class_time', 'Sem horário')
-            found_days = set()
-            for day_name, day_num in days_order.items():
-                if day_name in days_text:
-                    found_days.add(day_num)
-            
-            if not found_days:
-                found_days.add(99)
-            
-            for day_num in found_days:
-                if student not in organized[day_num][time_text]:
-                    organized[day_num][time_text].append(student)
+        """
+        Junta a grade pré-calculada (weekday -> horário -> ids) com os dados dos
+        alunos num único passo: O(n) no total de vagas da grade.
+        """
+        students_by_id = {student['id']: student for student in students}
+        organized = {}
+        for weekday, times in self.db.get_schedule_slots().items():
+            # Abas numeradas de 1 (segunda) a 7 (domingo); 99 = dias não reconhecidos
+            day_num = 99 if weekday is None else weekday + 1
+            organized[day_num] = {
+                time: [students_by_id[sid] for sid in ids if sid in students_by_id]
+                for time, ids in times.items()
+            }
         return organized
     
     def load_organized_students(self):
-        self.organized_view.controls.clear()
+        """Busca os alunos fora da thread da tela; as abas são montadas quando chegarem"""
+        self.loader.load(
+            "organized", self.fetch_organized_students, self.apply_organized_students,
+            on_error=lambda ex: SnackBarMessage.show(self.page, f"Erro ao carregar alunos: {ex}", False)
+        )
+
+    def fetch_organized_students(self):
+        # Versão lida ANTES das consultas: diz quais gravações esta leitura já enxerga
+        version = self.db.data_version('attendance')
         students = self.db.get_all_students()
+        if not students:
+            return students, {}, {}, version
+        # Presença de hoje para todos os alunos (uma consulta só)
+        attendance_today = self.db.get_attendance_map(datetime.now().strftime('%Y-%m-%d'))
+        return students, self.organize_students_by_day_time(students), attendance_today, version
+
+    def apply_organized_students(self, result):
+        students, organized, attendance_today, version = result
+        self.loaded = True
+        self.organized_view.controls.clear()
+        self.mini_card_holders = {}
+        # Só descarta a marcação otimista se esta leitura já inclui a gravação
+        # (uma carga iniciada antes do commit ainda traz o dado antigo)
+        for student_id, (_, written) in list(self.pending.items()):
+            if written is not None and self.db.data_version_covers(version, written):
+                self.pending.pop(student_id, None)
         
         if not students:
             self.organized_view.controls.append(
@@ -51,10 +75,10 @@ class OrganizedStudentsView:
                     padding=50
                 )
             )
-            self.page.update()
+            schedule_update(self.page)
             return
         
-        organized = self.organize_students_by_day_time(students)
+        self.attendance_today = attendance_today
         day_names = {
             1: 'Segunda-feira', 2: 'Terça-feira', 3: 'Quarta-feira',
             4: 'Quinta-feira', 5: 'Sexta-feira', 6: 'Sábado', 7: 'Domingo', 99: 'Outros'
@@ -81,7 +105,7 @@ class OrganizedStudentsView:
                 unselected_label_color=ft.colors.ON_SURFACE_VARIANT
             )
         )
-        self.page.update()
+        schedule_update(self.page)
     
     def build_times_for_day(self, times_dict):
         times_column = ft.Column(spacing=15)
@@ -104,8 +128,22 @@ class OrganizedStudentsView:
                         f"({len(students_in_time)} alunos)",
                         size=14,
                         color=ft.colors.ON_SECONDARY_CONTAINER,
-                        opacity=0.7
-                    )
+                        opacity=0.7,
+                        expand=True
+                    ),
+                    # Chamada da turma inteira (só os pendentes)
+                    ft.IconButton(
+                        icon=ft.icons.DONE_ALL,
+                        icon_color=ft.colors.GREEN,
+                        tooltip="Todos presentes",
+                        on_click=lambda e, s=students_in_time: self.mark_slot(s, True)
+                    ),
+                    ft.IconButton(
+                        icon=ft.icons.REMOVE_DONE,
+                        icon_color=ft.colors.ERROR,
+                        tooltip="Todos com falta",
+                        on_click=lambda e, s=students_in_time: self.mark_slot(s, False)
+                    ),
                 ], spacing=10),
                 padding=10,
                 bgcolor=ft.colors.SECONDARY_CONTAINER, # Adapta ao dark/light
@@ -116,19 +154,33 @@ class OrganizedStudentsView:
             
             for student in students_in_time:
                 student_card = self.build_student_mini_card(student)
-                times_column.controls.append(
-                    ft.Container(
-                        content=student_card,
-                        padding=ft.padding.only(left=20) # Indentação leve
-                    )
+                holder = ft.Container(
+                    content=student_card,
+                    padding=ft.padding.only(left=20) # Indentação leve
                 )
+                self.mini_card_holders.setdefault(student['id'], []).append((holder, student))
+                times_column.controls.append(holder)
         
         return times_column
     
+    def attendance_status(self, student_id):
+        """1 = presente, 0 = falta, None = pendente (marcações ainda na fila já contam)"""
+        pending = self.pending.get(student_id)
+        if pending is not None:
+            return 1 if pending[0] else 0
+        record = self.attendance_today.get(student_id)
+        return record[0] if record else None
+
+    def refresh_mini_cards(self, student_id):
+        """Recria só os mini cards do aluno (em todas as abas) e agenda o envio deles"""
+        holders = self.mini_card_holders.get(student_id, [])
+        for holder, student in holders:
+            holder.content = self.build_student_mini_card(student)
+        if holders:
+            schedule_update(self.page, *[holder for holder, _ in holders])
+
     def build_student_mini_card(self, student):
-        from datetime import datetime
-        today = datetime.now().strftime('%Y-%m-%d')
-        attendance_today = self.db.get_attendance_by_date(student['id'], today)
+        attendance_today = self.attendance_status(student['id'])
         
         if attendance_today is not None:
             if attendance_today == 1:
@@ -168,12 +220,46 @@ class OrganizedStudentsView:
         )
     
     def mark_quick_present(self, student):
+        """
+        Marcação otimista: o mini card muda na hora e a gravação vai para a fila
+        em lote. Se falhar, a marcação é desfeita com um aviso.
+        """
+        student_id = student['id']
         today = datetime.now().strftime('%Y-%m-%d')
-        if self.db.mark_attendance(student['id'], today, True):
-            SnackBarMessage.show(self.page, f"Presença marcada!", True)
-            self.load_organized_students()
+        entry = [True, None]
+        self.pending[student_id] = entry
+        self.refresh_mini_cards(student_id)
+        SnackBarMessage.show(self.page, "Presença marcada!", True)
+
+        def saved():
+            # Confirmada no lugar: o card já mostra a marcação, e a próxima carga
+            # que incluir esta versão descarta a entrada (sem recarregar a tela)
+            entry[1] = self.db.data_version('attendance')
+
+        def failed(ex):
+            if self.pending.get(student_id) is entry:
+                self.pending.pop(student_id, None)
+            self.refresh_mini_cards(student_id)
+            SnackBarMessage.show(self.page, f"Não foi possível salvar {student['name']}: marcação desfeita", False)
+
+        self.db.queue_attendance(student_id, today, True, on_done=saved, on_error=failed)
+    
+    def mark_slot(self, students, present):
+        """Marca presença/falta para todos os pendentes do horário numa única transação"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        pending = [s for s in students if self.attendance_status(s['id']) is None]
+        if not pending:
+            SnackBarMessage.show(self.page, "Todos já foram marcados!", False)
+            return
+        
+        count = self.db.mark_attendance_bulk([(s['id'], today, present) for s in pending])
+        SnackBarMessage.show(self.page, f"{'Presença' if present else 'Falta'} para {count} alunos", present)
+        self.load_organized_students()
     
     def build(self):
+        # Carga anterior descartada (saiu da tela antes de terminar): busca de novo
+        if not self.loaded:
+            self.load_organized_students()
         return ft.Column([
             ft.Container(
                 content=ft.Row([
@@ -1,13 +1,16 @@
 import flet as ft
 from database.db_manager import DatabaseManager
-from components.common import CustomButton, SnackBarMessage
+from components.common import CustomButton, SnackBarMessage, SkeletonList
+from components.background_loader import BackgroundLoader
+from components.render_scheduler import schedule_update
 
 class TeacherProfileView:
     def __init__(self, page: ft.Page, db_manager: DatabaseManager, username: str):
         self.page = page
         self.db = db_manager
         self.username = username
-        self.stats = self.db.get_teacher_stats()
+        self.stats = None
+        self.loader = BackgroundLoader(page)
         
         # Componentes de estado
         self.note_field = ft.TextField(
@@ -15,13 +18,32 @@ class TeacherProfileView:
             multiline=True,
             min_lines=8,
             max_lines=12,
-            value=self.db.get_teacher_note(),
             border_color=ft.colors.OUTLINE_VARIANT,
             bgcolor=ft.colors.SURFACE,
             on_change=self.auto_save_note,
             hint_text="Ideias, lembretes rápidos, coisas para não esquecer..."
         )
         
+        # Recebe o perfil quando os dados chegarem; até lá mostra o esqueleto
+        self.body = ft.Container(
+            content=SkeletonList(rows=5, height=90),
+            # Aqui aplicamos o padding para evitar corte no final da rolagem
+            padding=ft.padding.only(bottom=20),
+            expand=True
+        )
+
+    def load_profile(self):
+        """Busca estatísticas e nota fora da thread da tela; o perfil é montado ao chegar"""
+        self.loader.load(
+            "profile", lambda: (self.db.get_teacher_stats(), self.db.get_teacher_note()), self.apply_profile,
+            on_error=lambda ex: SnackBarMessage.show(self.page, f"Erro ao carregar perfil: {ex}", False)
+        )
+
+    def apply_profile(self, result):
+        self.stats, self.note_field.value = result
+        self.body.content = self.build_content()
+        schedule_update(self.page, self.body)
+
     def auto_save_note(self, e):
         """Salva automaticamente ao digitar"""
         self.db.save_teacher_note(self.note_field.value)
@@ -46,11 +68,11 @@ class TeacherProfileView:
                 ft.Divider(),
                 ft.Text("Dica: Mantenha a constância para subir de nível!", size=12, italic=True)
             ], tight=True, width=300),
-            actions=[ft.TextButton("Entendi", on_click=lambda e: setattr(self.page.dialog, 'open', False) or self.page.update())]
+            actions=[ft.TextButton("Entendi", on_click=lambda e: setattr(self.page.dialog, 'open', False) or schedule_update(self.page))]
         )
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        schedule_update(self.page)
 
     def build_achievement_badge(self, icon, title, condition, color_active):
         """Cria uma medalha que se ilumina se a condição for verdadeira"""
@@ -126,6 +148,11 @@ class TeacherProfileView:
         )
 
     def build(self):
+        # A view é recriada a cada visita (MainView): estatísticas e nota sempre atuais
+        self.load_profile()
+        return self.body
+
+    def build_content(self):
         # Define conquistas baseadas nos stats reais
         total_aulas = self.stats['classes']
         total_alunos = self.stats['students']
@@ -138,47 +165,40 @@ class TeacherProfileView:
             self.build_achievement_badge(ft.icons.ROCKET_LAUNCH, "Influenciador (50 Alunos)", total_alunos >= 50, ft.colors.RED),
         ], alignment=ft.MainAxisAlignment.CENTER, spacing=15, wrap=True)
 
-        # CORREÇÃO: Envolvemos a Column em um Container para usar padding
-        return ft.Container(
-            content=ft.Column([
-                ft.Text("Meu Perfil & Conquistas", size=28, weight=ft.FontWeight.BOLD, color=ft.colors.ON_SURFACE),
-                
-                # 1. Card de Nível
-                self.build_level_card(),
-                
-                ft.Container(height=5),
-                
-                # 2. Estatísticas
-                ft.Row([
-                    self.build_stat_box(ft.icons.GROUPS, self.stats['students'], "Alunos Ativos", ft.colors.BLUE),
-                    self.build_stat_box(ft.icons.CLASS_, self.stats['classes'], "Aulas Ministradas", ft.colors.GREEN),
-                    self.build_stat_box(ft.icons.STAR, int(self.stats['xp']), "XP Total", ft.colors.AMBER),
-                ], spacing=10),
-                
-                ft.Container(height=10),
-                
-                # 3. Área de Conquistas (Visual Rewards)
-                ft.Container(
-                    content=ft.Column([
-                        ft.Text("Galeria de Conquistas", size=16, weight=ft.FontWeight.BOLD, color=ft.colors.ON_SURFACE),
-                        ft.Divider(height=10, color=ft.colors.TRANSPARENT),
-                        achievements_row
-                    ]),
-                    padding=20,
-                    bgcolor=ft.colors.SURFACE,
-                    border_radius=12,
-                    border=ft.border.all(1, ft.colors.OUTLINE_VARIANT)
-                ),
-                
-                ft.Container(height=10),
-                
-                # 4. Brain Dump
-                ft.Text("Brain Dump - Notas Rápidas", size=18, weight=ft.FontWeight.BOLD, color=ft.colors.ON_SURFACE),
-                self.note_field,
-                
-            ], scroll=ft.ScrollMode.AUTO, expand=True, spacing=15),
+        return ft.Column([
+            ft.Text("Meu Perfil & Conquistas", size=28, weight=ft.FontWeight.BOLD, color=ft.colors.ON_SURFACE),
             
-            # Aqui aplicamos o padding para evitar corte no final da rolagem
-            padding=ft.padding.only(bottom=20),
-            expand=True
-        )
\ No newline at end of file
+            # 1. Card de Nível
+            self.build_level_card(),
+            
+            ft.Container(height=5),
+            
+            # 2. Estatísticas
+            ft.Row([
+                self.build_stat_box(ft.icons.GROUPS, self.stats['students'], "Alunos Ativos", ft.colors.BLUE),
+                self.build_stat_box(ft.icons.CLASS_, self.stats['classes'], "Aulas Ministradas", ft.colors.GREEN),
+                self.build_stat_box(ft.icons.STAR, int(self.stats['xp']), "XP Total", ft.colors.AMBER),
+            ], spacing=10),
+            
+            ft.Container(height=10),
+            
+            # 3. Área de Conquistas (Visual Rewards)
+            ft.Container(
+                content=ft.Column([
+                    ft.Text("Galeria de Conquistas", size=16, weight=ft.FontWeight.BOLD, color=ft.colors.ON_SURFACE),
+                    ft.Divider(height=10, color=ft.colors.TRANSPARENT),
+                    achievements_row
+                ]),
+                padding=20,
+                bgcolor=ft.colors.SURFACE,
+                border_radius=12,
+                border=ft.border.all(1, ft.colors.OUTLINE_VARIANT)
+            ),
+            
+            ft.Container(height=10),
+            
+            # 4. Brain Dump
+            ft.Text("Brain Dump - Notas Rápidas", size=18, weight=ft.FontWeight.BOLD, color=ft.colors.ON_SURFACE),
+            self.note_field,
+            
+        ], scroll=ft.ScrollMode.AUTO, expand=True, spacing=15)
\ No newline at end of file
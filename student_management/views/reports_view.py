@@ -1,122 +1,148 @@
 import flet as ft
+import threading
 from datetime import datetime
 from database.db_manager import DatabaseManager
-from utils.reports import generate_daily_report, generate_monthly_report, generate_financial_report
+from utils.report_sinks import FileSink, DownloadSink
+from utils.report_data import REPORT_TABLES, collect_daily_report, collect_period_report, collect_financial_report
+from utils.report_jobs import ReportJob, get_report_runner
 from components.common import SnackBarMessage
+from components.render_scheduler import schedule_update
 
 class ReportsView:
     def __init__(self, page: ft.Page, db_manager: DatabaseManager):
         self.page = page
         self.db = db_manager
+        self.runner = get_report_runner()
+        # No desktop o PDF vai para relatorios/ e abre no visualizador; no modo
+        # web é publicado pelo servidor do Flet e aberto no navegador de quem pediu
+        self.sink = DownloadSink(page) if page.web else FileSink()
+        # Fica fora do build(): os relatórios continuam ao trocar de tela
+        self.jobs_column = ft.Column(spacing=8)
+        self.jobs_section = ft.Column([
+            ft.Text("Relatórios em andamento", size=18, weight=ft.FontWeight.BOLD),
+            self.jobs_column
+        ], visible=False)
+        self.job_rows = {}  # id do job -> (linha, barra, texto da etapa, botão)
+        self.job_shown = {}  # id do job -> última etapa desenhada
+        self._jobs_lock = threading.Lock()
+
+    def run_report(self, title, kind, collect, period):
+        """
+        Busca os dados e gera o PDF em segundo plano, com o progresso na lista da tela.
+        period identifica o relatório no cache: pedido de novo com os mesmos dados, sai na hora.
+        O cache é do processo, então a chave leva também o arquivo do banco; a versão
+        vem de table_versions, a mesma para todas as sessões abertas nesse arquivo.
+        """
+        bar = ft.ProgressBar(value=0, width=220)
+        status_text = ft.Text(ReportJob.QUEUED, size=12, color=ft.colors.ON_SURFACE_VARIANT)
+        button = ft.IconButton(ft.icons.CLOSE, tooltip="Cancelar")
+        row = ft.Container(
+            content=ft.Row([
+                ft.Column([ft.Text(title, weight=ft.FontWeight.BOLD), status_text], spacing=2, expand=True),
+                bar,
+                button
+            ], vertical_alignment=ft.CrossAxisAlignment.CENTER),
+            padding=10, border_radius=8,
+            border=ft.border.all(1, ft.colors.OUTLINE_VARIANT)
+        )
+
+        # O runner pode avisar a primeira etapa antes da linha estar registrada:
+        # o lock segura o aviso e o refresh abaixo desenha o que já aconteceu
+        with self._jobs_lock:
+            job = self.runner.submit(
+                title, kind, collect, sink=self.sink, on_update=self.on_job_update,
+                cache_key=(self.db.db_name,) + tuple(period), version=lambda: self.db.data_version(*REPORT_TABLES[kind])
+            )
+            self.job_rows[job.id] = (row, bar, status_text, button)
+            self.refresh_job_row(job)
+        button.on_click = lambda e: self.on_job_button(job)
+        # Mais recente no topo
+        self.jobs_column.controls.insert(0, row)
+        self.jobs_section.visible = True
+        schedule_update(self.page, self.jobs_section)
+
+    def on_job_update(self, job):
+        """Chamado pelo runner (outra thread) a cada etapa do relatório"""
+        with self._jobs_lock:
+            self.refresh_job_row(job)
+
+    def refresh_job_row(self, job):
+        """Desenha a etapa atual do job (uma vez por etapa)"""
+        controls = self.job_rows.get(job.id)
+        if controls is None or self.job_shown.get(job.id) == job.status:
+            return
+        self.job_shown[job.id] = job.status
+        row, bar, status_text, button = controls
+
+        status_text.value = job.status
+        bar.value = job.progress
+        if job.finished:
+            button.icon = ft.icons.DELETE_OUTLINE
+            button.tooltip = "Remover da lista"
+            if job.status == ReportJob.FAILED:
+                bar.color = ft.colors.RED
+                status_text.value = f"{job.status}: {job.error}"
+                SnackBarMessage.show(self.page, f"Erro ao gerar relatório: {job.error}", False)
+            elif job.status == ReportJob.DONE:
+                status_text.value = f"{job.status}: {job.sink.describe(job.result)}"
+                # Abrir o visualizador pode demorar: não segura a thread do runner
+                threading.Thread(target=self.open_report, args=(job,), daemon=True).start()
+        schedule_update(self.page, row)
+
+    def open_report(self, job):
+        try:
+            job.sink.open(job.result)
+        except Exception as ex:
+            print(f"Erro ao abrir relatório: {ex}")
+        SnackBarMessage.show(self.page, job.sink.describe(job.result), True)
+
+    def on_job_button(self, job):
+        """Cancela o relatório em andamento ou tira da lista o que já terminou"""
+        if not job.finished:
+            self.runner.cancel(job)
+            return
+        with self._jobs_lock:
+            controls = self.job_rows.pop(job.id, None)
+            self.job_shown.pop(job.id, None)
+        if controls is not None and controls[0] in self.jobs_column.controls:
+            self.jobs_column.controls.remove(controls[0])
+        self.jobs_section.visible = bool(self.jobs_column.controls)
+        schedule_update(self.page, self.jobs_section)
         
     def handle_daily_report(self, e):
         """Relatório de Presença de Hoje"""
         today = datetime.now().strftime('%Y-%m-%d')
-        students = self.db.get_all_students()
-        
-        report_data = []
-        for s in students:
-            status_code = self.db.get_attendance_by_date(s['id'], today)
-            if status_code == 1: status = "Presente"
-            elif status_code == 0: status = "Falta"
-            else: status = "Pendente"
-                
-            report_data.append({
-                "name": s['name'],
-                "course": s['course'],
-                "time": s.get('class_time', '-'),
-                "status": status
-            })
-        
-        data = {
-            "title": f"Relatorio Diario - {datetime.now().strftime('%d/%m/%Y')}",
-            "students": report_data,
-            "date": today
-        }
-        generate_daily_report(self.page, data)
+        self.run_report("Diário de Classe", "daily", lambda: collect_daily_report(self.db, today), (today,))
 
     def handle_monthly_report(self, e):
         """Relatório de Frequência do Mês Atual"""
         today = datetime.now()
-        start_date = today.replace(day=1).strftime('%Y-%m-%d')
-        # Gambiarra segura para pegar ultimo dia do mês (vai até dia 28/30/31)
-        import calendar
-        last_day = calendar.monthrange(today.year, today.month)[1]
-        end_date = today.replace(day=last_day).strftime('%Y-%m-%d')
-        
-        students = self.db.get_all_students()
-        report_data = []
-        
-        for s in students:
-            summary = self.db.get_attendance_summary(s['id']) # Pega geral (poderia filtrar por data no DB, mas serve)
-            report_data.append({
-                "name": s['name'],
-                "course": s['course'],
-                "present": summary['present'],
-                "absent": summary['absent'],
-                "percentage": f"{summary['percentage']:.0f}%"
-            })
-            
-        data = {
-            "title": f"Relatorio Mensal - {today.strftime('%B/%Y')}",
-            "students": report_data,
-            "period": f"{start_date} a {end_date}"
-        }
-        generate_monthly_report(self.page, data)
+        month_key = today.strftime('%Y-%m')
+        title = f"Relatorio Mensal - {today.strftime('%B/%Y')}"
+        self.run_report(title, "monthly", lambda: collect_period_report(self.db, title, month_key, month_key),
+                        (title, month_key, month_key))
+
+    def handle_quarterly_report(self, e):
+        """Relatório de Frequência do Trimestre Atual"""
+        today = datetime.now()
+        quarter = (today.month - 1) // 3 + 1
+        first_month = (quarter - 1) * 3 + 1
+        title = f"Relatorio Trimestral - {quarter}o tri/{today.year}"
+        start_month, end_month = f"{today.year}-{first_month:02d}", f"{today.year}-{first_month + 2:02d}"
+        self.run_report(title, "monthly", lambda: collect_period_report(self.db, title, start_month, end_month),
+                        (title, start_month, end_month))
+
+    def handle_yearly_report(self, e):
+        """Relatório de Frequência do Ano Atual"""
+        year = datetime.now().year
+        title = f"Relatorio Anual - {year}"
+        self.run_report(title, "monthly", lambda: collect_period_report(self.db, title, f"{year}-01", f"{year}-12"),
+                        (title, f"{year}-01", f"{year}-12"))
 
     def handle_financial_report(self, e):
-        """Relatório Financeiro com valores definidos"""
-        students = self.db.get_all_students()
-        
-        # Tabela de Preços
-        prices = {
-            "Desenvolvimento de jogos 2D": 550.00,
-            "Unity 3D": 860.00,
-            "Lógica de programação": 320.00,
-            "Python para dados": 980.00
-        }
-        
-        # Custo Fixo Estimado
-        expenses = {
-            "Aluguel/Espaco": 800.00,
-            "Energia e Internet": 250.00,
-            "Marketing": 150.00,
-            "Softwares": 100.00
-        }
-        
-        revenue_details = []
-        total_revenue = 0.0
-        
-        # Calcula receita baseada nos alunos ativos e seus cursos
-        # Normaliza strings para evitar erros de digitação (caixa baixa)
-        for s in students:
-            course_name = s['course']
-            price = 0.0
-            
-            # Busca flexível no dicionário de preços
-            for key, val in prices.items():
-                if key.lower() in course_name.lower():
-                    price = val
-                    break
-            
-            # Se não achou preço exato, usa média ou 0 (aqui assumimos 0 se não cadastrado corretamente)
-            if price > 0:
-                revenue_details.append({"student": s['name'], "course": course_name, "value": price})
-                total_revenue += price
-        
-        total_expenses = sum(expenses.values())
-        net_profit = total_revenue - total_expenses
-        
-        data = {
-            "title": f"Relatorio Financeiro - {datetime.now().strftime('%B/%Y')}",
-            "revenue_details": revenue_details,
-            "total_revenue": total_revenue,
-            "expenses": expenses,
-            "total_expenses": total_expenses,
-            "net_profit": net_profit
-        }
-        
-        generate_financial_report(self.page, data)
+        """Relatório Financeiro com preços e despesas cadastrados no banco"""
+        month = datetime.now().strftime('%Y-%m')
+        self.run_report("Financeiro", "financial", lambda: collect_financial_report(self.db, month), (month,))
 
     def build(self):
         return ft.Container(
@@ -128,9 +154,14 @@ class ReportsView:
                 
                 ft.Row([
                     self.create_report_card("Diário de Classe", "Presença de hoje", ft.icons.TODAY, ft.colors.BLUE, self.handle_daily_report),
-                    self.create_report_card("Fechamento Mensal", "Frequência acumulada", ft.icons.CALENDAR_MONTH, ft.colors.ORANGE, self.handle_monthly_report),
+                    self.create_report_card("Fechamento Mensal", "Frequência do mês", ft.icons.CALENDAR_MONTH, ft.colors.ORANGE, self.handle_monthly_report),
+                    self.create_report_card("Fechamento Trimestral", "Frequência do trimestre", ft.icons.DATE_RANGE, ft.colors.PURPLE, self.handle_quarterly_report),
+                    self.create_report_card("Fechamento Anual", "Frequência do ano", ft.icons.EVENT_AVAILABLE, ft.colors.TEAL, self.handle_yearly_report),
                     self.create_report_card("Financeiro", "Receita x Despesas", ft.icons.ATTACH_MONEY, ft.colors.GREEN, self.handle_financial_report),
-                ], wrap=True, spacing=20)
+                ], wrap=True, spacing=20),
+                
+                ft.Container(height=20),
+                self.jobs_section
                 
             ], scroll=ft.ScrollMode.AUTO),
             padding=20,
@@ -1,18 +1,55 @@
 import flet as ft
+import threading
 from datetime import datetime, timedelta
 from database.db_manager import DatabaseManager
 from components.common import (
     CustomButton, CustomTextField, SnackBarMessage,
-    ConfirmDialog, StudentCard
+    ConfirmDialog, StudentCard, SkeletonList
 )
+from components.background_loader import BackgroundLoader
+from components.keyed_list import KeyedList
+from components.render_scheduler import get_render_scheduler, schedule_update
 
 class StudentsView:
+    # Alunos buscados por vez ao rolar a lista (o primeiro desenho não depende do total)
+    PAGE_SIZE = 50
+    # Distância (px) do fim da lista em que a próxima página é carregada
+    SCROLL_PREFETCH = 600
+    # Espera (s) depois da última tecla antes de buscar
+    SEARCH_DEBOUNCE = 0.25
+    # Dias por bloco no histórico (os anteriores são buscados ao rolar)
+    HISTORY_CHUNK_DAYS = 30
+    HISTORY_FIRST_DATE = datetime(2023, 1, 1)
+
     def __init__(self, page: ft.Page, db_manager: DatabaseManager):
         self.page = page
         self.db = db_manager
         
-        # Lista de alunos (com rolagem)
-        self.students_list = ft.Column(spacing=10, scroll=ft.ScrollMode.AUTO)
+        # Lista virtualizada: o cliente só desenha as linhas visíveis e as páginas
+        # seguintes são buscadas sob demanda conforme a rolagem se aproxima do fim
+        self.students_list = ft.ListView(
+            spacing=10,
+            expand=True,
+            on_scroll=self.on_list_scroll,
+            on_scroll_interval=100
+        )
+        self.loaded_students = []
+        self.has_more = False
+        self.searching = False
+        self._search_timer = None
+        # A carga em segundo plano, a rolagem e os eventos da tela mexem na mesma lista
+        self._load_lock = threading.RLock()
+        # Reconciliação por id do aluno (evita recriar a lista inteira a cada recarga)
+        self.student_items = KeyedList(self.students_list)
+        self.loader = BackgroundLoader(page)
+        self.loaded = False
+        self.students_list.controls = [SkeletonList()]
+        self.empty_state = self.build_empty_state()
+        self.no_results = ft.Container(
+            content=ft.Text("Nenhum aluno encontrado", size=16, color=ft.colors.ON_SURFACE_VARIANT),
+            alignment=ft.alignment.center,
+            padding=50
+        )
         
         # Barra de busca estilizada (Seguindo o tema)
         self.search_field = ft.TextField(
@@ -28,66 +65,142 @@ class StudentsView:
             content_padding=10
         )
         
-        # Carrega dados iniciais
+        # Carrega dados iniciais (em segundo plano)
         self.load_students()
     
     def filter_students(self, e):
-        """Filtra alunos visualmente sem recarregar do banco"""
-        search_term = self.search_field.value.lower()
-        for card_container in self.students_list.controls:
-            if isinstance(card_container.content, StudentCard):
-                card = card_container.content
-                student = card.student
-                # Lógica de filtro (Nome ou Curso)
-                visible = (search_term in student['name'].lower() or 
-                          search_term in student['course'].lower())
-                card_container.visible = visible
-        self.page.update()
-    
+        """Agenda a busca: numa sequência de teclas só a última dispara a consulta"""
+        if self._search_timer is not None:
+            self._search_timer.cancel()
+        self._search_timer = threading.Timer(self.SEARCH_DEBOUNCE, self.load_students)
+        self._search_timer.daemon = True
+        self._search_timer.start()
+
+    def build_empty_state(self):
+        return ft.Container(
+            content=ft.Column([
+                ft.Icon(ft.icons.SCHOOL, size=80, color=ft.colors.OUTLINE_VARIANT),
+                ft.Text("Nenhum aluno cadastrado", size=18, color=ft.colors.ON_SURFACE_VARIANT),
+                ft.Text("Clique em 'Novo Aluno' para começar", size=14, color=ft.colors.ON_SURFACE_VARIANT)
+            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+            alignment=ft.alignment.center,
+            padding=50
+        )
+
+    def build_student_item(self, student, attendance_marked):
+        # Cria o card passando os métodos callback
+        # O StudentCard já cuida das cores do tema internamente
+        card = StudentCard(
+            student=student,
+            on_edit=self.open_edit_dialog,
+            on_delete=self.confirm_delete,
+            on_attendance=self.open_attendance_dialog,
+            on_history=self.open_history_dialog,
+            show_quick_attendance=True,
+            on_quick_present=self.mark_quick_present,
+            on_quick_absent=self.mark_quick_absent,
+            attendance_marked=attendance_marked
+        )
+        return ft.Container(content=card)
+
     def load_students(self):
-        """Busca dados do banco e monta a lista"""
+        """
+        Recarrega a lista do início (abertura e mudança na busca) fora da thread
+        da tela: só a primeira página, as seguintes voltam a ser buscadas ao
+        rolar. Uma busca nova torna obsoleta a anterior ainda em andamento.
+        """
+        self.loader.load("students", self.fetch_students, self.apply_students, on_error=self.on_load_error)
+
+    def fetch_students(self):
+        # Índice em memória: devolve só os ids, sem percorrer os cards
+        matches = self.db.search_students(self.search_field.value)
+        if matches is not None:
+            # Busca ativa: a lista passa a ter só os encontrados (em ordem de nome)
+            return [s for s in self.db.get_all_students() if s['id'] in matches], True, False
+        students = self.db.get_students_page(None, self.PAGE_SIZE)
+        return students, False, len(students) == self.PAGE_SIZE
+
+    def apply_students(self, result):
+        """A reconciliação recria e envia só os cards novos, removidos ou alterados"""
+        with self._load_lock:
+            self.loaded_students, self.searching, self.has_more = result
+            self.loaded = True
+            self.render_students()
+
+    def on_load_error(self, ex):
+        print(f"Erro ao carregar alunos: {ex}")
+        SnackBarMessage.show(self.page, "Erro ao carregar lista de alunos", False)
+
+    def refresh_student(self, student_id):
+        """
+        Depois de criar, editar ou excluir um aluno: relê só ele e o encaixa na
+        janela já carregada, na ordem de nome, em vez de refazer todas as páginas.
+        """
+        with self._load_lock:
+            if self.searching or not self.loaded:
+                # O resultado da busca pode mudar com o novo nome/curso; e sem a
+                # primeira carga não há janela onde encaixar
+                return self.load_students()
+            try:
+                student = self.db.get_student(student_id)
+            except Exception as ex:
+                print(f"Erro ao carregar aluno: {ex}")
+                return self.load_students()
+            students = [s for s in self.loaded_students if s['id'] != student_id]
+            if student is not None and student['active']:
+                key = (student['name'], student['id'])
+                # Depois do último carregado, com páginas por vir: entra quando rolar até lá
+                if not (self.has_more and students and key > (students[-1]['name'], students[-1]['id'])):
+                    students.append(student)
+                    students.sort(key=lambda s: (s['name'], s['id']))
+            self.loaded_students = students
+            self.render_students()
+
+    def refresh_attendance(self):
+        """Presença mudou: os alunos carregados são os mesmos, só os cards marcados mudam"""
+        with self._load_lock:
+            # Ainda carregando: a carga em andamento já traz a presença nova
+            if self.loaded:
+                self.render_students()
+
+    def load_next_page(self):
+        """Acrescenta a próxima página (continua depois do último aluno carregado)"""
+        with self._load_lock:
+            if not self.has_more or not self.loaded_students:
+                return
+            last = self.loaded_students[-1]
+            try:
+                students = self.db.get_students_page(last['name'], self.PAGE_SIZE, after_id=last['id'])
+            except Exception as ex:
+                print(f"Erro ao carregar alunos: {ex}")
+                return
+            self.has_more = len(students) == self.PAGE_SIZE
+            if students:
+                self.loaded_students = self.loaded_students + students
+                self.render_students()
+
+    def on_list_scroll(self, e):
+        if self.has_more and e.max_scroll_extent is not None and \
+                e.pixels >= e.max_scroll_extent - self.SCROLL_PREFETCH:
+            self.load_next_page()
+
+    def render_students(self):
+        """
+        Reconcilia os cards com self.loaded_students (cards iguais são reaproveitados).
+        Numa busca, só os cards que entram ou saem do resultado são enviados.
+        """
         today = datetime.now().strftime('%Y-%m-%d')
-        self.students_list.controls.clear()
-        
-        try:
-            students = self.db.get_all_students()
-            
-            if not students:
-                self.students_list.controls.append(
-                    ft.Container(
-                        content=ft.Column([
-                            ft.Icon(ft.icons.SCHOOL, size=80, color=ft.colors.OUTLINE_VARIANT),
-                            ft.Text("Nenhum aluno cadastrado", size=18, color=ft.colors.ON_SURFACE_VARIANT),
-                            ft.Text("Clique em 'Novo Aluno' para começar", size=14, color=ft.colors.ON_SURFACE_VARIANT)
-                        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
-                        alignment=ft.alignment.center,
-                        padding=50
-                    )
-                )
-            else:
-                for student in students:
-                    attendance_today = self.db.get_attendance_by_date(student['id'], today)
-                    
-                    # Cria o card passando os métodos callback
-                    # O StudentCard já cuida das cores do tema internamente
-                    card = StudentCard(
-                        student=student,
-                        on_edit=self.open_edit_dialog,
-                        on_delete=self.confirm_delete,
-                        on_attendance=self.open_attendance_dialog,
-                        on_history=self.open_history_dialog,
-                        show_quick_attendance=True,
-                        on_quick_present=self.mark_quick_present,
-                        on_quick_absent=self.mark_quick_absent,
-                        attendance_marked=attendance_today is not None
-                    )
-                    self.students_list.controls.append(ft.Container(content=card))
-            
-            self.page.update()
-            
-        except Exception as ex:
-            print(f"Erro ao carregar alunos: {ex}")
-            SnackBarMessage.show(self.page, "Erro ao carregar lista de alunos", False)
+        students = self.loaded_students
+        # Uma consulta para a turma inteira em vez de uma por aluno
+        attendance_today = self.db.get_attendance_map(today) if students else {}
+
+        items = []
+        for student in students:
+            marked = student['id'] in attendance_today
+            signature = (tuple(student.items()), marked)
+            items.append((student['id'], signature, lambda s=student, m=marked: self.build_student_item(s, m)))
+
+        self.student_items.sync(items, empty_control=self.no_results if self.searching else self.empty_state)
 
     # =========================================================================
     # DIALOG DE ADICIONAR / EDITAR (Lógica Dinâmica + Estilo Novo)
@@ -111,14 +224,15 @@ class StudentsView:
             try:
                 if is_edit:
                     self.db.update_student(student['id'], name_field.value, course_field.value, days_field.value, time_field.value)
+                    student_id = student['id']
                     msg = "Aluno atualizado!"
                 else:
-                    self.db.create_student(name_field.value, course_field.value, days_field.value, time_field.value)
+                    student_id = self.db.create_student(name_field.value, course_field.value, days_field.value, time_field.value)
                     msg = "Aluno criado!"
                 
                 self.close_dialog()
                 SnackBarMessage.show(self.page, msg, True)
-                self.load_students()
+                self.refresh_student(student_id)
                 
             except Exception as ex:
                 SnackBarMessage.show(self.page, f"Erro ao salvar: {ex}", False)
@@ -139,7 +253,7 @@ class StudentsView:
         
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        schedule_update(self.page)
 
     def open_add_dialog(self, e):
         self.open_student_form(None)
@@ -168,7 +282,7 @@ class StudentsView:
             if self.db.mark_attendance(student['id'], date_str, present):
                 self.close_dialog()
                 SnackBarMessage.show(self.page, f"{'Presença' if present else 'Falta'} registrada!", True)
-                self.load_students() 
+                self.refresh_attendance()
 
         summary = self.db.get_attendance_summary(student['id'])
         
@@ -208,7 +322,7 @@ class StudentsView:
                     nonlocal attendance_date
                     attendance_date = evt.control.value
                     date_btn.text = f"Data: {attendance_date.strftime('%d/%m/%Y')}"
-                    self.page.update()
+                    schedule_update(self.page)
 
             dp = ft.DatePicker(
                 on_change=on_date_change,
@@ -216,102 +330,146 @@ class StudentsView:
                 last_date=datetime.now() + timedelta(days=365)
             )
             self.page.overlay.append(dp)
-            self.page.update()
+            get_render_scheduler(self.page).update_now()
             dp.pick_date()
             
         date_btn.on_click = open_picker_clean
 
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        schedule_update(self.page)
 
     # =========================================================================
     # DIALOG DE HISTÓRICO (Com Filtros e Ações)
     # =========================================================================
     def open_history_dialog(self, student):
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-        
-        history_list = ft.Column(spacing=5, scroll=ft.ScrollMode.AUTO, height=400)
+        """
+        Histórico do mais recente para o mais antigo. Cada bloco de dias vem numa
+        consulta só (presença + observação); ao rolar até o fim, ou pelo botão
+        "Carregar dias anteriores" (blocos curtos, como o de 7 dias, não enchem a
+        lista e então não há rolagem), o bloco anterior é acrescentado.
+        """
+        history_list = ft.ListView(spacing=5, height=400, on_scroll_interval=100)
         date_range_label = ft.Text("", size=12, color=ft.colors.ON_SURFACE_VARIANT)
+        state = {"oldest": None, "newest": None}
+        # Rolagem, botão e filtros podem chegar juntos: um bloco por vez
+        chunk_lock = threading.Lock()
+        more_button = ft.TextButton("Carregar dias anteriores", icon=ft.icons.EXPAND_MORE,
+                                    on_click=lambda e: load_older(blocking=True))
 
-        def refresh_list(start, end):
-            history_list.controls.clear()
-            date_range_label.value = f"Período: {start.strftime('%d/%m')} a {end.strftime('%d/%m')}"
-            
+        def load_chunk(end, days):
+            start = max(end - timedelta(days=days - 1), self.HISTORY_FIRST_DATE)
+            if end < start:
+                return
             data = self.db.get_attendance(student['id'], start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
-            att_map = {d['date']: d['present'] for d in data}
+            records = {d['date']: (d['present'], d['note']) for d in data}
             
-            curr = start
-            while curr <= end:
+            curr = end
+            while curr >= start:
                 d_str = curr.strftime('%Y-%m-%d')
-                status = att_map.get(d_str)
-                row = self.build_history_row(student, d_str, curr, status, lambda: refresh_list(start, end))
-                history_list.controls.append(row)
-                curr += timedelta(days=1)
-            self.page.update()
+                history_list.controls.append(self.build_history_row(student, d_str, curr, records.get(d_str)))
+                curr -= timedelta(days=1)
+            state["oldest"] = start
+            more_button.visible = start > self.HISTORY_FIRST_DATE
+            date_range_label.value = f"Período: {start.strftime('%d/%m/%Y')} a {state['newest'].strftime('%d/%m/%Y')}"
+            schedule_update(self.page)
+
+        def reset(days):
+            # Espera um bloco em andamento terminar: ele não se mistura à lista nova
+            with chunk_lock:
+                history_list.controls.clear()
+                state["newest"] = datetime.now()
+                load_chunk(state["newest"], days)
+
+        def load_older(blocking=False):
+            """Acrescenta o bloco anterior ao dia mais antigo exibido"""
+            if state["oldest"] is None or not chunk_lock.acquire(blocking=blocking):
+                return
+            try:
+                load_chunk(state["oldest"] - timedelta(days=1), self.HISTORY_CHUNK_DAYS)
+            finally:
+                chunk_lock.release()
+
+        def on_scroll(e):
+            # Chegou perto do fim: busca os dias anteriores ao mais antigo exibido
+            if e.max_scroll_extent is None or e.pixels < e.max_scroll_extent - 200:
+                return
+            load_older()
+
+        history_list.on_scroll = on_scroll
 
         # Botões de filtro rápidos
         filter_row = ft.Row([
-            ft.TextButton("7 dias", on_click=lambda e: refresh_list(datetime.now()-timedelta(days=7), datetime.now())),
-            ft.TextButton("30 dias", on_click=lambda e: refresh_list(datetime.now()-timedelta(days=30), datetime.now())),
+            ft.TextButton("7 dias", on_click=lambda e: reset(7)),
+            ft.TextButton("30 dias", on_click=lambda e: reset(30)),
         ], alignment=ft.MainAxisAlignment.CENTER)
 
         dialog = ft.AlertDialog(
             modal=True,
             title=ft.Text(f"Histórico: {student['name']}"),
-            content=ft.Column([filter_row, date_range_label, ft.Divider(), history_list], tight=True, width=500),
+            content=ft.Column([filter_row, date_range_label, ft.Divider(), history_list, more_button], tight=True, width=500),
             actions=[ft.TextButton("Fechar", on_click=lambda e: self.close_dialog())]
         )
 
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        schedule_update(self.page)
         
         # Carrega inicial
-        refresh_list(start_date, end_date)
-
-    def build_history_row(self, student, date_str, date_obj, status, refresh_callback):
-        """Cria uma linha do histórico com ações"""
-        if status is None:
-            icon, color = ft.icons.CIRCLE_OUTLINED, ft.colors.OUTLINE
-        elif status:
-            icon, color = ft.icons.CHECK_CIRCLE, ft.colors.GREEN
-        else:
-            icon, color = ft.icons.CANCEL, ft.colors.ERROR
+        reset(self.HISTORY_CHUNK_DAYS)
+
+    def build_history_row(self, student, date_str, date_obj, record):
+        """
+        Cria uma linha do histórico com ações. record = (present, note) ou None.
+        As ações gravam e redesenham só esta linha.
+        """
+        holder = ft.Container(
+            padding=5,
+            border=ft.border.only(bottom=ft.border.BorderSide(1, ft.colors.OUTLINE_VARIANT))
+        )
+
+        def render(record):
+            status = record[0] if record else None
+            note_text = record[1] if record else ""
+            if status is None:
+                icon, color = ft.icons.CIRCLE_OUTLINED, ft.colors.OUTLINE
+            elif status:
+                icon, color = ft.icons.CHECK_CIRCLE, ft.colors.GREEN
+            else:
+                icon, color = ft.icons.CANCEL, ft.colors.ERROR
+
+            row_content = ft.Row([
+                ft.Icon(icon, color=color, size=20),
+                ft.Text(date_obj.strftime("%d/%m - %a"), size=14, expand=True, color=ft.colors.ON_SURFACE),
+                
+                # Botões mini
+                ft.IconButton(ft.icons.CHECK, icon_color=ft.colors.GREEN, icon_size=18, on_click=lambda e: set_att(True), tooltip="Presente"),
+                ft.IconButton(ft.icons.CLOSE, icon_color=ft.colors.ERROR, icon_size=18, on_click=lambda e: set_att(False), tooltip="Falta"),
+                ft.IconButton(ft.icons.DELETE_OUTLINE, icon_color=ft.colors.OUTLINE, icon_size=18, on_click=lambda e: del_att(), tooltip="Limpar"),
+            ], spacing=2)
+
+            holder.content = ft.Column([
+                row_content,
+                ft.Text(f"Obs: {note_text}", size=11, italic=True, color=ft.colors.PRIMARY) if note_text else ft.Container()
+            ], spacing=2)
+
+        def changed(record):
+            render(record)
+            schedule_update(self.page, holder)
+            # Marcação de hoje também muda o card do aluno na lista
+            if date_str == datetime.now().strftime('%Y-%m-%d'):
+                self.refresh_attendance()
 
         def set_att(present):
             self.db.mark_attendance(student['id'], date_str, present)
-            refresh_callback() 
+            changed((present, ""))
         
         def del_att():
-            # Acesso direto para remover (poderia estar no db_manager, mas ok por simplicidade)
-            conn = self.db.get_connection() 
-            conn.cursor().execute("DELETE FROM attendance WHERE student_id=? AND date=?", (student['id'], date_str))
-            conn.commit()
-            conn.close()
-            refresh_callback()
-
-        note_text = self.db.get_attendance_note(student['id'], date_str)
-        
-        row_content = ft.Row([
-            ft.Icon(icon, color=color, size=20),
-            ft.Text(date_obj.strftime("%d/%m - %a"), size=14, expand=True, color=ft.colors.ON_SURFACE),
-            
-            # Botões mini
-            ft.IconButton(ft.icons.CHECK, icon_color=ft.colors.GREEN, icon_size=18, on_click=lambda e: set_att(True), tooltip="Presente"),
-            ft.IconButton(ft.icons.CLOSE, icon_color=ft.colors.ERROR, icon_size=18, on_click=lambda e: set_att(False), tooltip="Falta"),
-            ft.IconButton(ft.icons.DELETE_OUTLINE, icon_color=ft.colors.OUTLINE, icon_size=18, on_click=lambda e: del_att(), tooltip="Limpar"),
-        ], spacing=2)
+            self.db.delete_attendance(student['id'], date_str)
+            changed(None)
 
-        return ft.Container(
-            content=ft.Column([
-                row_content,
-                ft.Text(f"Obs: {note_text}", size=11, italic=True, color=ft.colors.PRIMARY) if note_text else ft.Container()
-            ], spacing=2),
-            padding=5,
-            border=ft.border.only(bottom=ft.border.BorderSide(1, ft.colors.OUTLINE_VARIANT))
-        )
+        render(record)
+        return holder
 
     # =========================================================================
     # UTILITÁRIOS
@@ -319,18 +477,18 @@ class StudentsView:
     def close_dialog(self):
         if self.page.dialog:
             self.page.dialog.open = False
-            self.page.update()
+            schedule_update(self.page)
     
     def confirm_delete(self, student):
         def delete_action():
             self.db.delete_student(student['id'])
-            self.load_students()
+            self.refresh_student(student['id'])
             SnackBarMessage.show(self.page, "Aluno removido", True)
 
         dialog = ConfirmDialog("Excluir", f"Remover {student['name']}?", delete_action)
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        schedule_update(self.page)
 
     def mark_quick_present(self, student):
         today = datetime.now().strftime('%Y-%m-%d')
@@ -339,7 +497,7 @@ class StudentsView:
         else:
             self.db.mark_attendance(student['id'], today, True)
             SnackBarMessage.show(self.page, f"Presença: {student['name']}", True)
-            self.load_students() 
+            self.refresh_attendance()
 
     def mark_quick_absent(self, student):
         today = datetime.now().strftime('%Y-%m-%d')
@@ -348,7 +506,7 @@ class StudentsView:
         else:
             self.db.mark_attendance(student['id'], today, False)
             SnackBarMessage.show(self.page, f"Falta: {student['name']}", False)
-            self.load_students()
+            self.refresh_attendance()
 
     def open_date_picker(self, on_change_callback):
         pass
@@ -357,6 +515,9 @@ class StudentsView:
     # BUILD (INTERFACE)
     # =========================================================================
     def build(self):
+        # Carga anterior descartada (saiu da tela antes de terminar): busca de novo
+        if not self.loaded:
+            self.load_students()
         return ft.Column([
             ft.Container(
                 content=ft.Row([